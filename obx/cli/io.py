@@ -1,5 +1,4 @@
 import typer
-import subprocess
 import urllib.parse
 import json
 from pathlib import Path
@@ -15,11 +14,12 @@ from obx.utils.ui import (
     extract_usage,
     log_tokens_generated,
 )
-from obx.cli.utils import ensure_configured
+from obx.cli.utils import ensure_configured, open_uri
 from obx.core.config import settings
 from obx.utils.fs import read_note, write_note, fuzzy_find
 from obx.utils.editor import Editor
 from obx.agents.editor import editor_agent, EditProposal
+from obx.rag import daemon
 from obx.rag.engine import RAG
 
 def open_command(
@@ -111,7 +111,7 @@ def open_command(
             
             uri = f"obsidian://open?vault={vault_name}&file={file_path}"
             
-            subprocess.run(["open", uri])
+            open_uri(uri)
         else:
             console.print(f"[red]Note '{note}' not found.[/red]")
 
@@ -160,9 +160,11 @@ def insert_command(
             console.print("[dim]No note specified. Searching vault for best match...[/dim]")
             # We need the RAG engine
             try:
-                rag = RAG()
                 # Search for the content itself to find related context
-                results = rag.search(content, limit=1)
+                results = daemon.search(content, limit=1)
+                if results is None:
+                    # Daemon not running yet (or disabled) - search in-process
+                    results = RAG().search(content, limit=1)
                 if results:
                     best = results[0]
                     source = best.get('source')
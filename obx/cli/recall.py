@@ -18,9 +18,10 @@ from obx.utils.ui import (
     render_markdown,
     extract_usage,
 )
-from obx.cli.utils import ensure_configured, update_note_scores
+from obx.cli.utils import ensure_configured, update_note_scores, update_note_scores_bulk
 from obx.core.config import settings
 from obx.utils.fs import (
+    atomic_write_text,
     resolve_note_path,
     get_learning_scores,
     update_learning_scores,
@@ -35,7 +36,8 @@ from obx.core.flashcard import Flashcard, FlashcardAlgorithm, Rating, calculate_
 from obx.core.exercise import Exercise, ExerciseGrade, calculate_exercise_score
 from obx.core.recall import RecallOrchestrator, TopicTypeEstimator
 from obx.agents.recall_agent import recall_agent, exercise_reviewer_agent
-from obx.rag.engine import RAG
+from obx.rag import daemon
+from obx.rag.engine import RAG, INDEX_PATH
 
 
 # Custom style for questionary
@@ -108,15 +110,18 @@ async def _run_recall_session(
                 note_items_map[path] = note_items
                 all_flashcards.extend(flashcards)
                 all_exercises.extend(exercises)
-                
-                # Recalculate and update YAML scores for this note immediately
-                # This ensures scores are up-to-date (handles decayed memory or deleted items)
-                new_content = update_note_scores(path, note_items, content)
-                if new_content != content:
-                    note_content_map[path] = new_content
-                    path.write_text(new_content, encoding="utf-8")
             except Exception as e:
-                console.print(f"[yellow]Warning: Could not read/update {path}: {e}[/yellow]")
+                console.print(f"[yellow]Warning: Could not read {path}: {e}[/yellow]")
+        
+        # Which note each item came from, so a review only re-parses that note
+        item_paths = {}
+        for path, note_items in note_items_map.items():
+            for item in note_items['flashcards'] + note_items['exercises']:
+                item_paths.setdefault(item.id, path)
+        
+        # Recalculate and update YAML scores for all notes up front
+        # This ensures scores are up-to-date (handles decayed memory or deleted items)
+        note_content_map.update(update_note_scores_bulk(note_items_map, note_content_map))
         
         if not all_flashcards and not all_exercises:
             console.print("[yellow]No flashcards or exercises found in the note(s).[/yellow]")
@@ -201,7 +206,8 @@ async def _run_recall_session(
                 all_flashcards = [c if c.id != updated.id else updated for c in all_flashcards]
                 
                 # Find which note contains this flashcard and update it
-                for path, content in note_content_map.items():
+                for path in _owner_first(item_paths.get(updated.id), note_content_map):
+                    content = note_content_map[path]
                     try:
                         # Update flashcard content
                         new_content = update_flashcard_in_content(content, updated)
@@ -219,7 +225,7 @@ async def _run_recall_session(
                         note_content_map[path] = new_content
                         
                         # Write updated content to file
-                        path.write_text(new_content, encoding="utf-8")
+                        atomic_write_text(path, new_content)
                         break  # Found the note with this card
                     except ValueError:
                         continue  # Card not in this note
@@ -229,7 +235,8 @@ async def _run_recall_session(
                 all_exercises = [e if e.id != updated.id else updated for e in all_exercises]
                 
                 # Find which note contains this exercise and update it
-                for path, content in note_content_map.items():
+                for path in _owner_first(item_paths.get(updated.id), note_content_map):
+                    content = note_content_map[path]
                     try:
                         # Update exercise content
                         new_content = update_exercise_in_content(content, updated)
@@ -247,7 +254,7 @@ async def _run_recall_session(
                         note_content_map[path] = new_content
                         
                         # Write updated content to file
-                        path.write_text(new_content, encoding="utf-8")
+                        atomic_write_text(path, new_content)
                         break  # Found the note with this exercise
                     except ValueError:
                         continue  # Exercise not in this note
@@ -265,15 +272,26 @@ async def _run_recall_session(
 
 
 
+def _owner_first(owner: Optional[Path], note_content_map: dict) -> list[Path]:
+    """Note paths to search for an item, starting with the note it was parsed from."""
+    paths = list(note_content_map)
+    if owner in note_content_map:
+        paths.remove(owner)
+        paths.insert(0, owner)
+    return paths
+
+
 def _find_topic_notes(topic: str) -> list[Path]:
     """Find notes related to a topic using search."""
     try:
-        rag = RAG()
-        if not rag.index_exists():
+        if not INDEX_PATH.exists():
             console.print("[yellow]Search index not found. Run 'obx index' first.[/yellow]")
             return []
         
-        results = rag.search(topic, limit=5)
+        results = daemon.search(topic, limit=5)
+        if results is None:
+            # Daemon not running yet (or disabled) - search in-process
+            results = RAG().search(topic, limit=5)
         paths = []
         seen = set()
         
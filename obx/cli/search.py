@@ -1,10 +1,11 @@
+import os
 import typer
 import asyncio
+import heapq
 from rich.panel import Panel
 from rich.markdown import Markdown
 import questionary
-import urllib.parse
-import subprocess
+from urllib.parse import quote_from_bytes
 from pathlib import Path
 from collections import defaultdict
 
@@ -17,9 +18,15 @@ from obx.utils.ui import (
     log_embedding_usage,
     log_tokens_generated,
 )
-from obx.cli.utils import ensure_configured
+from obx.cli.utils import ensure_configured, open_uri
 from obx.core.config import settings
-from obx.utils.fs import resolve_note_path
+from obx.utils.fs import resolve_note_path, find_by_name, append_to_note, read_text_prefix
+
+# Characters left unescaped when building obsidian:// URIs
+_URI_SAFE = b"/"
+
+# Max bytes of a note placed in the ask prompt (~100k tokens)
+NOTE_PROMPT_BUDGET = 400_000
 
 def index_command(
     clear: bool = typer.Option(False, "--clear", help="Clear the existing index and re-index everything.")
@@ -49,10 +56,14 @@ def search_command(
         console.print(f"[bold blue]Searching for:[/bold blue] {topic}...")
         
         try:
-            with console.status("Initializing search engine..."):
-                from obx.rag.engine import RAG
-                rag = RAG()
-                results = rag.search(topic, limit=15)
+            from obx.rag import daemon
+            results = daemon.search(topic, limit=15)
+            if results is None:
+                # Daemon not running yet (or disabled) - search in-process
+                with console.status("Initializing search engine..."):
+                    from obx.rag.engine import RAG
+                    rag = RAG()
+                    results = rag.search(topic, limit=15)
                 
             if not results:
                 console.print("[yellow]No results found.[/yellow]")
@@ -64,15 +75,16 @@ def search_command(
                 source = r.get("source", "Unknown")
                 grouped[source].append(r)
                 
-            # Sort notes by their best chunk's score
-            sorted_sources = sorted(grouped.items(), key=lambda x: max(c['score'] for c in x[1]), reverse=True)
+            # Rank notes by their best chunk's score, keeping each note's top 3 chunks
+            sorted_sources = [
+                (source, heapq.nlargest(3, chunks, key=lambda c: c['score']))
+                for source, chunks in grouped.items()
+            ]
+            sorted_sources.sort(key=lambda x: x[1][0]['score'], reverse=True)
             
             # Display Results
             for source, chunks in sorted_sources:
-                # Sort chunks by score
-                chunks.sort(key=lambda x: x['score'], reverse=True)
-                top_chunk = chunks[0]
-                max_score = top_chunk['score']
+                max_score = chunks[0]['score']
                 
                 # Header
                 console.print(f"\n[bold cyan underline]📄 {source}[/bold cyan underline] (Best Score: {max_score:.2f})")
@@ -99,7 +111,6 @@ def search_command(
                     return
                 lines = [f"\n## Search results: {topic}", ""]
                 for source, chunks in sorted_sources:
-                    chunks.sort(key=lambda x: x['score'], reverse=True)
                     lines.append(f"### {source}")
                     for chunk in chunks[:3]:
                         score = chunk.get("score", 0)
@@ -110,9 +121,7 @@ def search_command(
                             lines.append(text)
                             lines.append("")
                 try:
-                    existing = target.read_text(encoding="utf-8")
-                    new_content = existing.rstrip() + "\n\n" + "\n".join(lines) + "\n"
-                    target.write_text(new_content, encoding="utf-8")
+                    append_to_note(target, "\n".join(lines))
                     console.print(f"[green]Added search results to {target.name}[/green]")
                 except Exception as e:
                     console.print(f"[red]Error writing to {target}: {e}[/red]")
@@ -136,15 +145,15 @@ def search_command(
                         selected_path = Path(r.get("path"))
                         break
                 
-                if selected_path and selected_path.exists():
+                if selected_path and os.path.isfile(selected_path):
                     console.print(f"Opening {answer}...")
                     vault = settings.vault_path
-                    vault_name = urllib.parse.quote(vault.name)
+                    vault_name = quote_from_bytes(vault.name.encode("utf-8"), _URI_SAFE)
                     relative_path = selected_path.relative_to(vault)
-                    file_path_encoded = urllib.parse.quote(str(relative_path))
+                    file_path_encoded = quote_from_bytes(relative_path.as_posix().encode("utf-8"), _URI_SAFE)
                     
                     uri = f"obsidian://open?vault={vault_name}&file={file_path_encoded}"
-                    subprocess.run(["open", uri])
+                    open_uri(uri)
                 else:
                     console.print(f"[red]Could not find file path for {answer}[/red]")
             else:
@@ -176,15 +185,15 @@ def ask_command(
             if not target_path.suffix: 
                 target_path = target_path.with_suffix(".md")
                 
-            if target_path.exists():
+            if os.path.isfile(target_path):
                 target = target_path
                 resolved_mode = "note"
             else:
-                # 2. Recursive exact match
+                # 2. Recursive exact match (name or trailing subpath, via the vault index)
                 note_name = question if question.endswith(".md") else f"{question}.md"
-                matches = list(vault.rglob(note_name))
-                if matches:
-                    target = matches[0]
+                match = find_by_name(note_name)
+                if match:
+                    target = match
                     resolved_mode = "note"
 
     # Print intent first
@@ -197,7 +206,9 @@ def ask_command(
             # Prepare the prompt
             if resolved_mode == "note":
                 try:
-                    content = target.read_text(encoding="utf-8")
+                    content, truncated = read_text_prefix(target, NOTE_PROMPT_BUDGET)
+                    if truncated:
+                        content += f"\n\n[Note truncated to its first {NOTE_PROMPT_BUDGET} bytes]"
                     prompt = (
                         f"Answer questions about the following note. "
                         f"Provide relevant information based on its content.\n"
@@ -232,9 +243,7 @@ def ask_command(
                         return
                     if output:
                         try:
-                            existing = write_target.read_text(encoding="utf-8")
-                            new_content = existing.rstrip() + "\n\n" + output.strip() + "\n"
-                            write_target.write_text(new_content, encoding="utf-8")
+                            append_to_note(write_target, output.strip())
                             console.print(f"[green]Added answer to {write_target.name}[/green]")
                         except Exception as e:
                             console.print(f"[red]Error writing to {write_target}: {e}[/red]")
@@ -1,8 +1,13 @@
+import os
+import subprocess
+import sys
 import typer
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Optional
 from obx.core.config import settings
 from obx.utils.ui import console
-from obx.utils.fs import update_note_yaml
+from obx.utils.fs import atomic_write_text, update_note_yaml
 from obx.core.learning_parser import get_all_learning_items
 from obx.core.flashcard import calculate_memory_score
 from obx.core.exercise import calculate_exercise_score
@@ -13,6 +18,19 @@ def ensure_configured():
         console.print("Run [bold]obx config[/bold] to set up your vault path and API keys.")
         raise typer.Exit(code=1)
 
+def open_uri(uri: str) -> None:
+    """Open a URI (e.g. obsidian://) with the OS handler without waiting for it."""
+    if sys.platform == "win32":
+        os.startfile(uri)
+        return
+    opener = "open" if sys.platform == "darwin" else "xdg-open"
+    subprocess.Popen(
+        [opener, uri],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
 def update_note_scores(path: Path, note_items: dict, note_content: str) -> str:
     """
     Update the YAML frontmatter for a note with current memory and exercise scores.
@@ -39,3 +57,49 @@ def update_note_scores(path: Path, note_items: dict, note_content: str) -> str:
     except Exception as e:
         console.print(f"[yellow]Warning: Could not update scores in {path.name}: {e}[/yellow]")
         return note_content
+
+
+def update_note_scores_bulk(
+    items_by_path: Dict[Path, dict],
+    contents: Optional[Dict[Path, str]] = None,
+) -> Dict[Path, str]:
+    """
+    Refresh the YAML scores of many notes, writing each changed note once.
+
+    Notes are independent and the work is mostly file I/O, so they are
+    processed on a thread pool.
+
+    Args:
+        items_by_path: Maps note path -> dict with 'flashcards' and 'exercises'
+        contents: Already-read note contents; notes missing here are read from disk
+
+    Returns:
+        Maps note path -> up-to-date content (notes that failed are omitted)
+    """
+    contents = contents or {}
+
+    def refresh(path: Path) -> Optional[str]:
+        try:
+            content = contents.get(path)
+            if content is None:
+                content = path.read_text(encoding="utf-8")
+            new_content = update_note_scores(path, items_by_path[path], content)
+            if new_content != content:
+                atomic_write_text(path, new_content)
+            return new_content
+        except Exception as e:
+            console.print(f"[yellow]Warning: Could not update {path}: {e}[/yellow]")
+            return None
+
+    if len(items_by_path) <= 1:
+        results = map(refresh, items_by_path)
+    else:
+        workers = min(32, (os.cpu_count() or 1) * 4, len(items_by_path))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(refresh, items_by_path))
+
+    return {
+        path: content
+        for path, content in zip(items_by_path, results)
+        if content is not None
+    }
@@ -1,7 +1,8 @@
+import json
 from pathlib import Path
 from typing import Optional, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 HOME_DIR = Path.home()
 OBX_DIR = HOME_DIR / ".obx"
@@ -29,6 +30,12 @@ class Settings(BaseSettings):
     # Embedding Settings
     embedding_provider: str = Field("sentence-transformers", description="Embedding provider")
     embedding_model: str = Field("all-MiniLM-L6-v2", description="Embedding model name")
+    embedding_batch_size: int = Field(128, ge=1, description="Number of chunks sent to the embedding model per batch")
+    # Smaller, faster vector index at some cost in recall; applies to indexes built after changing it
+    embedding_quantize: Optional[int] = Field(None, ge=1, le=8, description="Scalar-quantize stored vectors to this many bits (1-8), or None for full precision")
+
+    # Keep the search engine loaded in a background daemon between commands
+    search_daemon: bool = Field(True, description="Serve searches from a background daemon")
 
     # Persona
     mood: str = Field("helpful", description="Persona/Mood of the assistant")
@@ -45,45 +52,57 @@ class Settings(BaseSettings):
         extra='ignore'
     )
 
+    # Memoized result of is_configured (cleared on save)
+    _is_configured: Optional[bool] = PrivateAttr(default=None)
+
     @property
     def is_configured(self) -> bool:
-        return self.vault_path is not None and self.vault_path.exists()
+        if self._is_configured is None:
+            self._is_configured = self.vault_path is not None and self.vault_path.exists()
+        return self._is_configured
 
     def save(self):
         """Persist current settings to ~/.obx/.env"""
+        self._is_configured = None
         OBX_DIR.mkdir(parents=True, exist_ok=True)
-        import json
+        lines = []
+        if self.vault_path:
+            lines.append(f"VAULT_PATH={self.vault_path}")
+
+        # API Keys - Only write if they were explicitly set in the config session
+        # If they are None, we don't write them, allowing system env vars to take likely precedence or just remaining unset
+        if self.gemini_api_key: lines.append(f"GEMINI_API_KEY={self.gemini_api_key}")
+        if self.openai_api_key: lines.append(f"OPENAI_API_KEY={self.openai_api_key}")
+        if self.anthropic_api_key: lines.append(f"ANTHROPIC_API_KEY={self.anthropic_api_key}")
+        if self.openrouter_api_key: lines.append(f"OPENROUTER_API_KEY={self.openrouter_api_key}")
+        if self.cohere_api_key: lines.append(f"COHERE_API_KEY={self.cohere_api_key}")
+        if self.voyage_api_key: lines.append(f"VOYAGE_API_KEY={self.voyage_api_key}")
+
+        # Models
+        lines.append(f"PRIMARY_MODEL={self.primary_model}")
+        lines.append(f"REASONING_MODEL={self.reasoning_model}")
+        lines.append(f"OCR_MODEL={self.ocr_model}")
+
+        if self.openrouter_reasoning_effort:
+            lines.append(f"OPENROUTER_REASONING_EFFORT={self.openrouter_reasoning_effort}")
+
+        lines.append(f"MOOD={self.mood}")
+
+        # Embeddings
+        lines.append(f"EMBEDDING_PROVIDER={self.embedding_provider}")
+        lines.append(f"EMBEDDING_MODEL={self.embedding_model}")
+        lines.append(f"EMBEDDING_BATCH_SIZE={self.embedding_batch_size}")
+        if self.embedding_quantize:
+            lines.append(f"EMBEDDING_QUANTIZE={self.embedding_quantize}")
+        lines.append(f"SEARCH_DAEMON={str(self.search_daemon).lower()}")
+
+        if self.output_dir:
+            lines.append(f"OUTPUT_DIR={self.output_dir}")
+
+        if self.exclude_folders:
+            lines.append(f"EXCLUDE_FOLDERS={json.dumps(self.exclude_folders)}")
+
         with open(ENV_FILE, "w") as f:
-            if self.vault_path:
-                f.write(f"VAULT_PATH={self.vault_path}\n")
-            
-            # API Keys - Only write if they were explicitly set in the config session
-            # If they are None, we don't write them, allowing system env vars to take likely precedence or just remaining unset
-            if self.gemini_api_key: f.write(f"GEMINI_API_KEY={self.gemini_api_key}\n")
-            if self.openai_api_key: f.write(f"OPENAI_API_KEY={self.openai_api_key}\n")
-            if self.anthropic_api_key: f.write(f"ANTHROPIC_API_KEY={self.anthropic_api_key}\n")
-            if self.openrouter_api_key: f.write(f"OPENROUTER_API_KEY={self.openrouter_api_key}\n")
-            if self.cohere_api_key: f.write(f"COHERE_API_KEY={self.cohere_api_key}\n")
-            if self.voyage_api_key: f.write(f"VOYAGE_API_KEY={self.voyage_api_key}\n")
-            
-            # Models
-            f.write(f"PRIMARY_MODEL={self.primary_model}\n")
-            f.write(f"REASONING_MODEL={self.reasoning_model}\n")
-            f.write(f"OCR_MODEL={self.ocr_model}\n")
-            
-            if self.openrouter_reasoning_effort:
-                f.write(f"OPENROUTER_REASONING_EFFORT={self.openrouter_reasoning_effort}\n")
-            
-            f.write(f"MOOD={self.mood}\n")
-            
-            # Embeddings
-            f.write(f"EMBEDDING_PROVIDER={self.embedding_provider}\n")
-            f.write(f"EMBEDDING_MODEL={self.embedding_model}\n")
-
-            if self.output_dir:
-                f.write(f"OUTPUT_DIR={self.output_dir}\n")
-            
-            if self.exclude_folders:
-                f.write(f"EXCLUDE_FOLDERS={json.dumps(self.exclude_folders)}\n")
+            f.write("\n".join(lines) + "\n")
 
 settings = Settings()
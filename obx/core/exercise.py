@@ -3,6 +3,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import IntEnum
+from hashlib import blake2b
 from typing import Optional, List, Dict, Any
 
 
@@ -41,9 +42,9 @@ class Exercise:
     tags: List[str] = field(default_factory=list)
     
     def __post_init__(self):
-        """Generate ID if not provided."""
+        """Generate a stable ID (independent of PYTHONHASHSEED) if not provided."""
         if self.id is None:
-            self.id = f"ex{hash(self.prompt) % 100000}"
+            self.id = f"ex{blake2b(self.prompt.encode('utf-8'), digest_size=4).hexdigest()}"
     
     def is_complete(self) -> bool:
         """Check if the exercise is considered complete (grade >= PARTIAL)."""
@@ -117,21 +118,19 @@ class ExerciseSelector:
         if not exercises:
             return None
         
-        # Sort by order first
-        sorted_exercises = sorted(exercises, key=lambda e: e.order)
-        
+        # Each tier only needs its lowest-order exercise, so take a min() instead of sorting
         # Priority 1: First incomplete exercise (grade < 2)
-        for ex in sorted_exercises:
-            if ex.grade < ExerciseGrade.PARTIAL:
-                return ex
+        incomplete = [e for e in exercises if e.grade < ExerciseGrade.PARTIAL]
+        if incomplete:
+            return min(incomplete, key=lambda e: e.order)
         
         # Priority 2: First partial exercise (grade == 2)
-        for ex in sorted_exercises:
-            if ex.grade == ExerciseGrade.PARTIAL:
-                return ex
+        partial = [e for e in exercises if e.grade == ExerciseGrade.PARTIAL]
+        if partial:
+            return min(partial, key=lambda e: e.order)
         
         # All correct - return the one with fewest attempts for reinforcement
-        return min(sorted_exercises, key=lambda e: e.attempts)
+        return min(exercises, key=lambda e: (e.attempts, e.order))
     
     @classmethod
     def get_incomplete(cls, exercises: List[Exercise]) -> List[Exercise]:
@@ -162,8 +161,6 @@ def calculate_exercise_score(exercises: List[Exercise]) -> float:
     if not exercises:
         return 0.0
     
-    total_score = 0.0
-    for ex in exercises:
-        total_score += ex.grade.value / 3.0
-    
-    return round(total_score / len(exercises), 2)
+    # Grades are small ints, so sum them and divide once
+    total_grade = sum(ex.grade.value for ex in exercises)
+    return round(total_grade / (3.0 * len(exercises)), 2)
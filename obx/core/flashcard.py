@@ -3,11 +3,21 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional, List, Tuple, Dict, Any
+from typing import Optional, List, Sequence, Tuple, Dict, Any
+import json
 import math
 import uuid
 
 
+def _json_str(value: Optional[str]) -> str:
+    """JSON-encode an optional string, skipping json.dumps for plain ASCII tokens."""
+    if value is None:
+        return "null"
+    if value.isascii() and value.replace("-", "").replace(":", "").replace(".", "").isalnum():
+        return f'"{value}"'
+    return json.dumps(value)
+
+
 class FlashcardState(str, Enum):
     """State of a flashcard in the SRS system."""
     NEW = "new"
@@ -25,15 +35,17 @@ class Rating(str, Enum):
     
     def to_int(self) -> int:
         """Convert rating to FSRS integer (1-4)."""
-        return {
-            Rating.AGAIN: 1,
-            Rating.HARD: 2,
-            Rating.GOOD: 3,
-            Rating.EASY: 4
-        }[self]
+        return _RATING_INTS[self]
+
+
+# All ratings, in the order options are presented
+_RATINGS = (Rating.AGAIN, Rating.HARD, Rating.GOOD, Rating.EASY)
+
+# Rating -> FSRS integer grade
+_RATING_INTS = {rating: i for i, rating in enumerate(_RATINGS, start=1)}
 
 
-@dataclass
+@dataclass(slots=True)
 class Flashcard:
     """
     A flashcard with FSRS state.
@@ -67,8 +79,12 @@ class Flashcard:
     
     @property
     def retrievability(self) -> float:
+        """Current probability of recall (R); see retrievability_at."""
+        return self.retrievability_at(datetime.now())
+    
+    def retrievability_at(self, now: datetime) -> float:
         """
-        Calculate current probability of recall (R) based on time elapsed.
+        Calculate probability of recall (R) at time now.
         
         Formula: R = (1 + elapsed / (9 * S)) ^ -1
         Where S is stability.
@@ -76,9 +92,9 @@ class Flashcard:
         if self.state == FlashcardState.NEW or self.last_reviewed is None:
             return 0.0
         
-        elapsed_days = (datetime.now() - self.last_reviewed).total_seconds() / 86400
         if self.stability <= 0:
             return 0.0
+        elapsed_days = (now - self.last_reviewed).total_seconds() / 86400
             
         return (1 + elapsed_days / (9 * self.stability)) ** -1
 
@@ -111,6 +127,20 @@ class Flashcard:
             "reviewed": self.last_reviewed.isoformat() if self.last_reviewed else None,
         }
     
+    def to_state_json(self) -> str:
+        """
+        Compact JSON of to_state_dict(), formatted directly from the fields.
+        
+        Output is identical to json.dumps(self.to_state_dict(), separators=(',', ':')).
+        """
+        return (
+            f'{{"id":{_json_str(self.id)},"state":"{self.state.value}","step":{self.step},'
+            f'"S":{round(self.stability, 2)!r},"D":{round(self.difficulty, 2)!r},'
+            f'"days":{self.scheduled_days},'
+            f'"due":{_json_str(self.due_date.isoformat() if self.due_date else None)},'
+            f'"reviewed":{_json_str(self.last_reviewed.isoformat() if self.last_reviewed else None)}}}'
+        )
+    
     @classmethod
     def from_state_dict(
         cls, 
@@ -153,6 +183,68 @@ class Flashcard:
         )
 
 
+def fsrs_review_step(
+    stability: float,
+    difficulty: float,
+    elapsed_days: float,
+    rating: int,
+    W: Sequence[float],
+) -> Tuple[float, float]:
+    """
+    FSRS stability/difficulty update for a review of a card in REVIEWING state.
+    
+    Pure float arithmetic (rating is the FSRS integer 1-4) so it can be reused
+    outside the Flashcard dataclass, e.g. for scheduling simulations.
+    
+    Returns (next_stability, next_difficulty).
+    """
+    # Current retrievability
+    if stability > 0:
+        retrievability = (1 + elapsed_days / (9 * stability)) ** -1
+    else:
+        retrievability = 0.0
+    
+    if rating == 1:
+        # Forgot - penalty for difficulty
+        next_d = min(10.0, difficulty + W[6])
+        
+        # Stability decrease formula
+        next_s = (
+            W[11]
+            * (next_d ** -W[12])
+            * ((stability + 1) ** W[13])
+            * math.exp(W[14] * (1 - retrievability))
+        )
+        return max(0.1, next_s), next_d
+    
+    # Update Difficulty (D)
+    # Mean reversion towards W[4] with update based on rating
+    next_d = difficulty - W[6] * (rating - 3)
+    next_d = W[5] * W[4] + (1 - W[5]) * next_d
+    next_d = max(1.0, min(10.0, next_d))  # Clamp to 1-10
+    
+    # Successful review (Hard, Good, Easy)
+    # Stability increase formula
+    stability_increase = (
+        math.exp(W[8])
+        * (11 - next_d)
+        * (stability ** -W[9])
+        * (math.exp(W[10] * (1 - retrievability)) - 1)
+    )
+    
+    if rating == 2:
+        # Hard: smaller stability increase
+        next_s = stability * (1 + stability_increase * 0.5)
+    elif rating == 3:
+        # Good: normal stability increase
+        next_s = stability * (1 + stability_increase)
+    else:
+        # Easy: larger stability increase
+        next_s = stability * (1 + stability_increase * W[15])
+    
+    return max(0.1, next_s), next_d
+
+
 class FlashcardAlgorithm:
     """
     FSRS (Free Spaced Repetition Scheduler) v4.5 Implementation.
@@ -166,7 +258,8 @@ class FlashcardAlgorithm:
     """
     
     # Default FSRS Weights (v4.5) - optimized for general learning
-    W = [
+    # (a tuple: indexed on every rating and never mutated)
+    W = (
         0.40255, 1.18385, 3.173, 15.69105,   # W[0-3]: Initial stability by rating
         7.19605,                              # W[4]: Initial difficulty
         0.5345,                               # W[5]: Difficulty mean reversion
@@ -181,15 +274,26 @@ class FlashcardAlgorithm:
         2.2698,                               # W[14]: Retrievability factor for failure
         0.2315,                               # W[15]: Easy bonus
         2.9482                                # W[16]: (unused in v4.5)
-    ]
+    )
     
     # Configuration
     REQUEST_RETENTION = 0.9   # Target retention (90%)
     MAX_INTERVAL = 36500      # Max interval days (~100 years)
     
+    # S -> interval multiplier, 9 * (1/R - 1); recompute when overriding REQUEST_RETENTION
+    _INTERVAL_FACTOR = 9 * (1 / REQUEST_RETENTION - 1)
+    
     # Learning steps before graduating to FSRS
     LEARNING_STEPS = [timedelta(minutes=1), timedelta(minutes=10)]
     RELEARNING_STEPS = [timedelta(minutes=10)]
+    
+    # State -> transition method, looked up by name so subclasses can override
+    _STATE_HANDLERS = {
+        FlashcardState.NEW: "_next_new",
+        FlashcardState.LEARNING: "_next_learning",
+        FlashcardState.RELEARNING: "_next_relearning",
+        FlashcardState.REVIEWING: "_next_reviewing",
+    }
 
     @classmethod
     def get_options(cls, card: Flashcard) -> List[Tuple[Rating, Flashcard]]:
@@ -199,12 +303,7 @@ class FlashcardAlgorithm:
         Returns list of (rating, new_card_state) tuples.
         """
         now = datetime.now()
-        return [
-            (Rating.AGAIN, cls._next_card(card, Rating.AGAIN, now)),
-            (Rating.HARD, cls._next_card(card, Rating.HARD, now)),
-            (Rating.GOOD, cls._next_card(card, Rating.GOOD, now)),
-            (Rating.EASY, cls._next_card(card, Rating.EASY, now)),
-        ]
+        return [(rating, cls._next_card(card, rating, now)) for rating in _RATINGS]
 
     @classmethod
     def apply_rating(cls, card: Flashcard, rating: Rating) -> Flashcard:
@@ -220,6 +319,8 @@ class FlashcardAlgorithm:
         Early reviews are handled gracefully - the retrievability calculation
         naturally accounts for elapsed time.
         """
+        # With __slots__ the keyword constructor beats copy.copy/replace;
+        # id is passed through, so __post_init__ does not generate one
         new_card = Flashcard(
             question=card.question,
             answer=card.answer,
@@ -234,160 +335,118 @@ class FlashcardAlgorithm:
             id=card.id
         )
 
-        # === NEW CARD ===
-        if new_card.state == FlashcardState.NEW:
-            cls._init_ds(new_card, rating)
-            new_card.state = FlashcardState.LEARNING
+        handler = getattr(cls, cls._STATE_HANDLERS[new_card.state])
+        return handler(card, new_card, rating, now)
+
+    @classmethod
+    def _next_new(cls, card: Flashcard, new_card: Flashcard, rating: Rating, now: datetime) -> Flashcard:
+        """First review of a new card."""
+        cls._init_ds(new_card, rating)
+        new_card.state = FlashcardState.LEARNING
+        new_card.step = 0
+        
+        if rating == Rating.EASY:
+            # Easy immediately graduates to Reviewing
+            new_card.state = FlashcardState.REVIEWING
+            interval = cls._next_interval(new_card.stability)
+            new_card.scheduled_days = interval
+            new_card.due_date = now + timedelta(days=interval)
+        else:
+            new_card.due_date = now + cls.LEARNING_STEPS[0]
+        
+        return new_card
+
+    @classmethod
+    def _next_learning(cls, card: Flashcard, new_card: Flashcard, rating: Rating, now: datetime) -> Flashcard:
+        """Review during the initial learning steps."""
+        if rating == Rating.AGAIN:
             new_card.step = 0
+            new_card.due_date = now + cls.LEARNING_STEPS[0]
+            cls._init_ds(new_card, rating)
             
-            if rating == Rating.EASY:
-                # Easy immediately graduates to Reviewing
-                new_card.state = FlashcardState.REVIEWING
-                interval = cls._next_interval(new_card.stability)
-                new_card.scheduled_days = interval
-                new_card.due_date = now + timedelta(days=interval)
-            else:
-                new_card.due_date = now + cls.LEARNING_STEPS[0]
+        elif rating == Rating.HARD:
+            # Stay in current step
+            step_idx = min(new_card.step, len(cls.LEARNING_STEPS) - 1)
+            new_card.due_date = now + cls.LEARNING_STEPS[step_idx]
             
-            return new_card
-
-        # === LEARNING STATE ===
-        elif new_card.state == FlashcardState.LEARNING:
-            if rating == Rating.AGAIN:
-                new_card.step = 0
-                new_card.due_date = now + cls.LEARNING_STEPS[0]
-                cls._init_ds(new_card, rating)
-                
-            elif rating == Rating.HARD:
-                # Stay in current step
-                step_idx = min(new_card.step, len(cls.LEARNING_STEPS) - 1)
-                new_card.due_date = now + cls.LEARNING_STEPS[step_idx]
-                
-            elif rating == Rating.GOOD:
-                new_card.step += 1
-                if new_card.step >= len(cls.LEARNING_STEPS):
-                    # Graduate to Reviewing
-                    new_card.state = FlashcardState.REVIEWING
-                    cls._init_ds(new_card, rating)
-                    interval = cls._next_interval(new_card.stability)
-                    new_card.scheduled_days = interval
-                    new_card.due_date = now + timedelta(days=interval)
-                else:
-                    new_card.due_date = now + cls.LEARNING_STEPS[new_card.step]
-                    
-            elif rating == Rating.EASY:
-                # Graduate immediately with higher stability
+        elif rating == Rating.GOOD:
+            new_card.step += 1
+            if new_card.step >= len(cls.LEARNING_STEPS):
+                # Graduate to Reviewing
                 new_card.state = FlashcardState.REVIEWING
                 cls._init_ds(new_card, rating)
                 interval = cls._next_interval(new_card.stability)
                 new_card.scheduled_days = interval
                 new_card.due_date = now + timedelta(days=interval)
-            
-            return new_card
-
-        # === RELEARNING STATE ===
-        elif new_card.state == FlashcardState.RELEARNING:
-            if rating == Rating.AGAIN:
-                new_card.step = 0
-                new_card.due_date = now + cls.RELEARNING_STEPS[0]
-                
-            elif rating == Rating.HARD:
-                step_idx = min(new_card.step, len(cls.RELEARNING_STEPS) - 1)
-                new_card.due_date = now + cls.RELEARNING_STEPS[step_idx]
-                
-            elif rating in [Rating.GOOD, Rating.EASY]:
-                # Graduate back to Reviewing
-                new_card.state = FlashcardState.REVIEWING
-                interval = cls._next_interval(new_card.stability)
-                if rating == Rating.EASY:
-                    interval = max(interval, new_card.scheduled_days + 1)
-                new_card.scheduled_days = interval
-                new_card.due_date = now + timedelta(days=interval)
-            
-            return new_card
-
-        # === REVIEWING STATE (main FSRS logic) ===
-        elif new_card.state == FlashcardState.REVIEWING:
-            # Calculate elapsed time and retrievability
-            elapsed_days = 0.0
-            if card.last_reviewed:
-                elapsed_days = max(0, (now - card.last_reviewed).total_seconds() / 86400)
-            
-            # Current retrievability (accounts for early/late reviews naturally)
-            if card.stability > 0:
-                retrievability = (1 + elapsed_days / (9 * card.stability)) ** -1
             else:
-                retrievability = 0.0
-            
-            # Update Difficulty (D)
-            # Mean reversion towards W[4] with update based on rating
-            next_d = card.difficulty - cls.W[6] * (rating.to_int() - 3)
-            next_d = cls.W[5] * cls.W[4] + (1 - cls.W[5]) * next_d
-            next_d = max(1.0, min(10.0, next_d))  # Clamp to 1-10
-            
-            # Update Stability (S) based on rating
-            next_s = card.stability
-            
-            if rating == Rating.AGAIN:
-                # Forgot - go to relearning
-                new_card.state = FlashcardState.RELEARNING
-                new_card.step = 0
-                
-                # Penalty for difficulty
-                next_d = min(10.0, card.difficulty + cls.W[6])
+                new_card.due_date = now + cls.LEARNING_STEPS[new_card.step]
                 
-                # Stability decrease formula
-                next_s = (
-                    cls.W[11] 
-                    * (next_d ** -cls.W[12]) 
-                    * ((card.stability + 1) ** cls.W[13]) 
-                    * math.exp(cls.W[14] * (1 - retrievability))
-                )
-                next_s = max(0.1, next_s)
-                
-                new_card.stability = next_s
-                new_card.difficulty = next_d
-                new_card.due_date = now + cls.RELEARNING_STEPS[0]
-                new_card.scheduled_days = 0
-                return new_card
-            
-            # Successful review (Hard, Good, Easy)
-            # Stability increase formula
-            stability_increase = (
-                math.exp(cls.W[8]) 
-                * (11 - next_d) 
-                * (card.stability ** -cls.W[9]) 
-                * (math.exp(cls.W[10] * (1 - retrievability)) - 1)
-            )
-            
-            if rating == Rating.HARD:
-                # Hard: smaller stability increase
-                next_s = card.stability * (1 + stability_increase * 0.5)
-            elif rating == Rating.GOOD:
-                # Good: normal stability increase
-                next_s = card.stability * (1 + stability_increase)
-            elif rating == Rating.EASY:
-                # Easy: larger stability increase
-                next_s = card.stability * (1 + stability_increase * cls.W[15])
-            
-            next_s = max(0.1, next_s)
-            new_card.stability = next_s
-            new_card.difficulty = next_d
-            
-            # Calculate next interval
-            interval = cls._next_interval(next_s)
+        elif rating == Rating.EASY:
+            # Graduate immediately with higher stability
+            new_card.state = FlashcardState.REVIEWING
+            cls._init_ds(new_card, rating)
+            interval = cls._next_interval(new_card.stability)
+            new_card.scheduled_days = interval
+            new_card.due_date = now + timedelta(days=interval)
+        
+        return new_card
+
+    @classmethod
+    def _next_relearning(cls, card: Flashcard, new_card: Flashcard, rating: Rating, now: datetime) -> Flashcard:
+        """Review during relearning after a lapse."""
+        if rating == Rating.AGAIN:
+            new_card.step = 0
+            new_card.due_date = now + cls.RELEARNING_STEPS[0]
             
-            # Ensure interval increases (or stays same for Hard)
-            if rating == Rating.HARD:
-                interval = max(card.scheduled_days, interval)
-            else:
-                interval = max(card.scheduled_days + 1, interval)
+        elif rating == Rating.HARD:
+            step_idx = min(new_card.step, len(cls.RELEARNING_STEPS) - 1)
+            new_card.due_date = now + cls.RELEARNING_STEPS[step_idx]
             
+        elif rating in [Rating.GOOD, Rating.EASY]:
+            # Graduate back to Reviewing
+            new_card.state = FlashcardState.REVIEWING
+            interval = cls._next_interval(new_card.stability)
+            if rating == Rating.EASY:
+                interval = max(interval, new_card.scheduled_days + 1)
             new_card.scheduled_days = interval
             new_card.due_date = now + timedelta(days=interval)
-            
-            return new_card
+        
+        return new_card
 
+    @classmethod
+    def _next_reviewing(cls, card: Flashcard, new_card: Flashcard, rating: Rating, now: datetime) -> Flashcard:
+        """Review of a graduated card (main FSRS logic)."""
+        # Calculate elapsed time (accounts for early/late reviews naturally)
+        elapsed_days = 0.0
+        if card.last_reviewed:
+            elapsed_days = max(0, (now - card.last_reviewed).total_seconds() / 86400)
+        
+        next_s, next_d = fsrs_review_step(
+            card.stability, card.difficulty, elapsed_days, rating.to_int(), cls.W
+        )
+        new_card.stability = next_s
+        new_card.difficulty = next_d
+        
+        if rating == Rating.AGAIN:
+            # Forgot - go to relearning
+            new_card.state = FlashcardState.RELEARNING
+            new_card.step = 0
+            new_card.due_date = now + cls.RELEARNING_STEPS[0]
+            new_card.scheduled_days = 0
+            return new_card
+        
+        # Calculate next interval
+        interval = cls._next_interval(next_s)
+        
+        # Ensure interval increases (or stays same for Hard)
+        if rating == Rating.HARD:
+            interval = max(card.scheduled_days, interval)
+        else:
+            interval = max(card.scheduled_days + 1, interval)
+        
+        new_card.scheduled_days = interval
+        new_card.due_date = now + timedelta(days=interval)
+        
         return new_card
 
     @classmethod
@@ -410,11 +469,11 @@ class FlashcardAlgorithm:
         Formula: Interval = S * 9 * (1/R - 1)
         Where R is target retention (e.g., 0.9 for 90%)
         """
-        new_interval = stability * 9 * (1 / cls.REQUEST_RETENTION - 1)
+        new_interval = stability * cls._INTERVAL_FACTOR
         return max(1, min(cls.MAX_INTERVAL, round(new_interval)))
 
 
-def calculate_memory_score(cards: List[Flashcard]) -> float:
+def calculate_memory_score(cards: List[Flashcard], now: Optional[datetime] = None) -> float:
     """
     Calculate overall memory score (0-1) based on flashcard states.
     
@@ -422,18 +481,20 @@ def calculate_memory_score(cards: List[Flashcard]) -> float:
     """
     if not cards:
         return 0.0
+    if now is None:
+        now = datetime.now()
     
     total_score = 0.0
+    max_steps = len(FlashcardAlgorithm.LEARNING_STEPS)
     
     for card in cards:
         if card.state == FlashcardState.NEW:
             card_score = 0.0
         elif card.state == FlashcardState.REVIEWING:
             # Use current retrievability
-            card_score = card.retrievability
+            card_score = card.retrievability_at(now)
         elif card.state == FlashcardState.LEARNING:
             # Based on learning step progress
-            max_steps = len(FlashcardAlgorithm.LEARNING_STEPS)
             card_score = 0.1 + (card.step / max_steps) * 0.3
         else:  # RELEARNING
             card_score = 0.2
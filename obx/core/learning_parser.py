@@ -8,6 +8,11 @@ from dataclasses import dataclass
 from obx.core.flashcard import Flashcard, FlashcardState
 from obx.core.exercise import Exercise, ExerciseGrade
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 
 # Regex patterns for parsing
 
@@ -29,6 +34,9 @@ EXERCISE_PATTERN = re.compile(
     re.MULTILINE
 )
 
+# Line starts of either block header above, found in one scan
+BLOCK_START_PATTERN = re.compile(r'^#(flashcard|exercise)', re.MULTILINE)
+
 # Alternative micro-card format with emoji
 MICRO_FLASHCARD_PATTERN = re.compile(
     r'^(?P<question>.+?)\s*:\s*(?P<answer>.+?)\s*(?:⚡️|🧠)\s*(?P<state>\{.*?\})?\s*$',
@@ -36,7 +44,29 @@ MICRO_FLASHCARD_PATTERN = re.compile(
 )
 
 
-@dataclass
+# Start of an exercise's feedback history (the whole marker line)
+FEEDBACK_HISTORY_PATTERN = re.compile(r'^[^\S\n]*###### Feedback History[^\n]*\n?', re.MULTILINE)
+
+# A chat message line within the feedback history: **User**: ..., **Assistant**: ...
+ROLE_LINE_PATTERN = re.compile(r'^[^\S\n]*\*\*(User|Assistant|Agent)\*\*:', re.MULTILINE)
+CHAT_ROLES = {"User": "user", "Assistant": "assistant", "Agent": "assistant"}
+
+# Run of whitespace following a --- delimiter
+_WHITESPACE = re.compile(r'\s*')
+
+# Individual #tags within the tags group of a block header
+TAG_PATTERN = re.compile(r'#(\w+)')
+
+# One-line and micro flashcards in a single scan; the outer group names the branch
+# and the one-line branch is tried first, so it wins where both would match
+SINGLE_LINE_FLASHCARD_PATTERN = re.compile(
+    r'(?P<oneline>^(?P<oneline_question>.+?)\s*:\s*(?P<oneline_answer>.+?)\s*#flashcard\s*(?P<oneline_state>\{.*?\})?\s*$)'
+    r'|(?P<micro>^(?P<micro_question>.+?)\s*:\s*(?P<micro_answer>.+?)\s*(?:⚡️|🧠)\s*(?P<micro_state>\{.*?\})?\s*$)',
+    re.MULTILINE
+)
+
+
+@dataclass(slots=True)
 class ParsedItem:
     """A parsed learning item with its position in the content."""
     item: Any  # Flashcard or Exercise
@@ -49,29 +79,161 @@ def _parse_state_json(state_str: Optional[str]) -> Dict[str, Any]:
     """Parse state JSON string, returning empty dict on failure."""
     if not state_str:
         return {}
+    # The patterns capture exactly {...}, so there is no whitespace to strip
     try:
-        return json.loads(state_str.strip())
-    except json.JSONDecodeError:
+        if orjson is not None:
+            return orjson.loads(state_str)
+        return json.loads(state_str)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
         return {}
 
 
+def _dump_state_json(state: Dict[str, Any]) -> str:
+    """Serialize a state dict to compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(state).decode()
+    return json.dumps(state, separators=(',', ':'))
+
+
+def _flashcard_state_json(card: Flashcard) -> str:
+    """Compact state JSON for a flashcard."""
+    # orjson on the dict is fastest; without it the hand-formatted template
+    # is ~2.5x faster than json.dumps
+    if orjson is not None:
+        return orjson.dumps(card.to_state_dict()).decode()
+    return card.to_state_json()
+
+
+def _parse_feedback_history(history: str) -> List[Dict[str, str]]:
+    """Parse the messages below an exercise's '###### Feedback History' line."""
+    # Repeated marker lines are ignored, not treated as message text
+    parts = ROLE_LINE_PATTERN.split(FEEDBACK_HISTORY_PATTERN.sub('', history))
+    chat_history = []
+    
+    # parts = [preamble, role, text, role, text, ...]; text before the first role is dropped
+    for role, text in zip(parts[1::2], parts[2::2]):
+        # Continuation lines keep their indentation; only the role line is trimmed
+        first_line, newline, rest = text.partition('\n')
+        chat_history.append({
+            "role": CHAT_ROLES[role],
+            "content": (first_line.strip() + newline + rest).strip(),
+        })
+    
+    return chat_history
+
+
 def _extract_block_content(content: str, start_pos: int) -> Tuple[str, int]:
     """
     Extract content from start_pos until the next --- delimiter or end.
     Returns (content, end_position).
     """
-    remaining = content[start_pos:]
+    # Find the next ---, without copying the rest of the content
+    hr_pos = content.find('\n---', start_pos)
+    if hr_pos == -1:
+        return content[start_pos:].strip(), len(content)
+    
+    # The delimiter swallows any whitespace (including blank lines) after it
+    end = _WHITESPACE.match(content, hr_pos + 4).end()
+    return content[start_pos:hr_pos].strip(), end
+
+
+def _parse_single_line_flashcards(content: str) -> List[ParsedItem]:
+    """Parse one-line and micro flashcards; one-line cards come first."""
+    oneline = []
+    micro = []
+    
+    # Parse one-line and micro flashcards in one pass (matches cannot overlap)
+    for match in SINGLE_LINE_FLASHCARD_PATTERN.finditer(content):
+        kind = match.lastgroup
+        question = match.group(f'{kind}_question').strip()
+        answer = match.group(f'{kind}_answer').strip()
+        state_dict = _parse_state_json(match.group(f'{kind}_state'))
+        
+        card = Flashcard.from_state_dict(question, answer, state_dict)
+        (oneline if kind == 'oneline' else micro).append(ParsedItem(
+            item=card,
+            start_pos=match.start(),
+            end_pos=match.end(),
+            original_text=match.group(0)
+        ))
+    
+    return oneline + micro
+
+
+def _parse_multiline_flashcard(content: str, match: re.Match) -> Optional[ParsedItem]:
+    """Parse the multi-line flashcard whose '#flashcard' header is match."""
+    start = match.start()
+    state_dict = _parse_state_json(match.group('state'))
+    
+    # Extract tags
+    tags_str = match.group('tags')
+    tags = TAG_PATTERN.findall(tags_str) if tags_str else []
+    
+    # Get the question (until first ---)
+    question_start = match.end()
+    question_text, after_q = _extract_block_content(content, question_start)
+    
+    if not question_text:
+        return None
+    
+    # Get the answer (until next ---)
+    answer_text, end_pos = _extract_block_content(content, after_q)
+    
+    if not answer_text:
+        answer_text = ""  # Allow empty answers for #spaced style
+    
+    card = Flashcard.from_state_dict(question_text, answer_text, state_dict, tags)
+    return ParsedItem(
+        item=card,
+        start_pos=start,
+        end_pos=end_pos,
+        original_text=content[start:end_pos]
+    )
+
+
+def _parse_exercise(content: str, match: re.Match) -> Optional[ParsedItem]:
+    """Parse the exercise whose '#exercise' header is match."""
+    start = match.start()
+    state_dict = _parse_state_json(match.group('state'))
+    
+    # Extract tags
+    tags_str = match.group('tags')
+    tags = TAG_PATTERN.findall(tags_str) if tags_str else []
     
-    # Find the next ---
-    hr_match = re.search(r'\n---\s*\n?', remaining)
-    if hr_match:
-        block = remaining[:hr_match.start()]
-        end = start_pos + hr_match.end()
+    # Get the prompt (until ---)
+    prompt_start = match.end()
+    prompt_text, end_pos = _extract_block_content(content, prompt_start)
+    
+    if not prompt_text:
+        return None
+    
+    # Split off the feedback history, if any
+    history_match = FEEDBACK_HISTORY_PATTERN.search(prompt_text)
+    if history_match:
+        chat_history = _parse_feedback_history(prompt_text[history_match.end():])
+        prompt_text = prompt_text[:history_match.start()]
     else:
-        block = remaining
-        end = len(content)
+        chat_history = []
+    
+    # Parse hints if present (lines starting with "Hint:")
+    prompt_lines = []
+    hints = []
+    for line in prompt_text.split('\n'):
+        stripped = line.strip()
+        if stripped.lower().startswith('hint:'):
+            hints.append(stripped[5:].strip())
+        else:
+            prompt_lines.append(line)
+    
+    prompt = '\n'.join(prompt_lines).strip()
     
-    return block.strip(), end
+    exercise = Exercise.from_state_dict(prompt, state_dict, hints, tags, chat_history=chat_history)
+    return ParsedItem(
+        item=exercise,
+        start_pos=start,
+        end_pos=end_pos,
+        original_text=content[start:end_pos]
+    )
 
 
 def parse_flashcards(content: str) -> List[ParsedItem]:
@@ -87,69 +249,13 @@ def parse_flashcards(content: str) -> List[ParsedItem]:
       Answer
       ---
     """
-    results = []
-    
-    # Parse one-line flashcards
-    for match in ONELINE_FLASHCARD_PATTERN.finditer(content):
-        question = match.group('question').strip()
-        answer = match.group('answer').strip()
-        state_dict = _parse_state_json(match.group('state'))
-        
-        card = Flashcard.from_state_dict(question, answer, state_dict)
-        results.append(ParsedItem(
-            item=card,
-            start_pos=match.start(),
-            end_pos=match.end(),
-            original_text=match.group(0)
-        ))
-    
-    # Parse micro flashcards
-    for match in MICRO_FLASHCARD_PATTERN.finditer(content):
-        # Skip if already parsed as one-line (overlapping patterns)
-        if any(p.start_pos <= match.start() < p.end_pos for p in results):
-            continue
-        
-        question = match.group('question').strip()
-        answer = match.group('answer').strip()
-        state_dict = _parse_state_json(match.group('state'))
-        
-        card = Flashcard.from_state_dict(question, answer, state_dict)
-        results.append(ParsedItem(
-            item=card,
-            start_pos=match.start(),
-            end_pos=match.end(),
-            original_text=match.group(0)
-        ))
+    results = _parse_single_line_flashcards(content)
     
     # Parse multi-line flashcards
     for match in MULTILINE_FLASHCARD_START.finditer(content):
-        start = match.start()
-        state_dict = _parse_state_json(match.group('state'))
-        
-        # Extract tags
-        tags_str = match.group('tags') or ""
-        tags = [t.strip().lstrip('#') for t in tags_str.split() if t.strip().startswith('#')]
-        
-        # Get the question (until first ---)
-        question_start = match.end()
-        question_text, after_q = _extract_block_content(content, question_start)
-        
-        if not question_text:
-            continue
-        
-        # Get the answer (until next ---)
-        answer_text, end_pos = _extract_block_content(content, after_q)
-        
-        if not answer_text:
-            answer_text = ""  # Allow empty answers for #spaced style
-        
-        card = Flashcard.from_state_dict(question_text, answer_text, state_dict, tags)
-        results.append(ParsedItem(
-            item=card,
-            start_pos=start,
-            end_pos=end_pos,
-            original_text=content[start:end_pos]
-        ))
+        parsed = _parse_multiline_flashcard(content, match)
+        if parsed is not None:
+            results.append(parsed)
     
     return results
 
@@ -167,73 +273,9 @@ def parse_exercises(content: str) -> List[ParsedItem]:
     results = []
     
     for match in EXERCISE_PATTERN.finditer(content):
-        start = match.start()
-        state_dict = _parse_state_json(match.group('state'))
-        
-        # Extract tags
-        tags_str = match.group('tags') or ""
-        tags = [t.strip().lstrip('#') for t in tags_str.split() if t.strip().startswith('#')]
-        
-        # Get the prompt (until ---)
-        prompt_start = match.end()
-        prompt_text, end_pos = _extract_block_content(content, prompt_start)
-        
-        if not prompt_text:
-            continue
-        
-        # Parse hints if present (lines starting with "Hint:")
-        lines = prompt_text.split('\n')
-        prompt_lines = []
-        hints = []
-        chat_history = []
-        
-        in_history = False
-        current_role = None
-        current_content = []
-        
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('###### Feedback History'):
-                in_history = True
-                continue
-            
-            if in_history:
-                if stripped.startswith('**User**:'):
-                    if current_role:
-                        chat_history.append({"role": current_role, "content": '\n'.join(current_content).strip()})
-                    current_role = "user"
-                    current_content = [stripped[9:].strip()]
-                elif stripped.startswith('**Assistant**:'):
-                    if current_role:
-                        chat_history.append({"role": current_role, "content": '\n'.join(current_content).strip()})
-                    current_role = "assistant"
-                    current_content = [stripped[14:].strip()]
-                elif stripped.startswith('**Agent**:'):
-                    if current_role:
-                        chat_history.append({"role": current_role, "content": '\n'.join(current_content).strip()})
-                    current_role = "assistant"
-                    current_content = [stripped[10:].strip()]
-                elif current_role:
-                    current_content.append(line)
-                continue
-
-            if stripped.lower().startswith('hint:'):
-                hints.append(stripped[5:].strip())
-            else:
-                prompt_lines.append(line)
-        
-        if current_role:
-            chat_history.append({"role": current_role, "content": '\n'.join(current_content).strip()})
-            
-        prompt = '\n'.join(prompt_lines).strip()
-        
-        exercise = Exercise.from_state_dict(prompt, state_dict, hints, tags, chat_history=chat_history)
-        results.append(ParsedItem(
-            item=exercise,
-            start_pos=start,
-            end_pos=end_pos,
-            original_text=content[start:end_pos]
-        ))
+        parsed = _parse_exercise(content, match)
+        if parsed is not None:
+            results.append(parsed)
     
     return results
 
@@ -246,7 +288,7 @@ def serialize_flashcard(card: Flashcard, multiline: bool = False) -> str:
         card: The flashcard to serialize
         multiline: If True, use multi-line format; otherwise one-line
     """
-    state_json = json.dumps(card.to_state_dict(), separators=(',', ':'))
+    state_json = _flashcard_state_json(card)
     
     if multiline or '\n' in card.question or '\n' in card.answer:
         # Multi-line format
@@ -265,7 +307,7 @@ def serialize_flashcard(card: Flashcard, multiline: bool = False) -> str:
 
 def serialize_exercise(ex: Exercise) -> str:
     """Serialize an exercise to markdown format."""
-    state_json = json.dumps(ex.to_state_dict(), separators=(',', ':'))
+    state_json = _dump_state_json(ex.to_state_dict())
     tags_str = ' '.join(f'#{t}' for t in ex.tags) if ex.tags else ''
     
     result = f"#exercise {state_json} {tags_str}\n{ex.prompt}"
@@ -319,42 +361,80 @@ def update_exercise_in_content(content: str, ex: Exercise) -> str:
     raise ValueError(f"Exercise not found in content: {ex.id}")
 
 
+def parse_all(content: str) -> Tuple[List[ParsedItem], List[ParsedItem]]:
+    """
+    Parse flashcards and exercises together.
+    
+    Equivalent to (parse_flashcards(content), parse_exercises(content)), but
+    '#flashcard' and '#exercise' block headers are located in a single scan.
+    """
+    flashcards = _parse_single_line_flashcards(content)
+    exercises = []
+    
+    # A header's trailing \s* may run onto the next line, so the full pattern is
+    # matched per candidate and, like separate finditer scans, a header is
+    # skipped if it starts inside the previous header match of the same kind
+    header_end = {'flashcard': 0, 'exercise': 0}
+    
+    for start in BLOCK_START_PATTERN.finditer(content):
+        kind = start.group(1)
+        if start.start() < header_end[kind]:
+            continue
+        
+        if kind == 'flashcard':
+            match = MULTILINE_FLASHCARD_START.match(content, start.start())
+            parse, target = _parse_multiline_flashcard, flashcards
+        else:
+            match = EXERCISE_PATTERN.match(content, start.start())
+            parse, target = _parse_exercise, exercises
+        if match is None:
+            continue
+        
+        header_end[kind] = match.end()
+        parsed = parse(content, match)
+        if parsed is not None:
+            target.append(parsed)
+    
+    return flashcards, exercises
+
+
 def get_all_learning_items(content: str) -> Tuple[List[Flashcard], List[Exercise]]:
     """Parse all flashcards and exercises from content."""
-    flashcards = [p.item for p in parse_flashcards(content)]
-    exercises = [p.item for p in parse_exercises(content)]
+    parsed_flashcards, parsed_exercises = parse_all(content)
+    flashcards = [p.item for p in parsed_flashcards]
+    exercises = [p.item for p in parsed_exercises]
     return flashcards, exercises
 
 
-def add_flashcards_to_content(content: str, cards: List[Flashcard], section: str = "Flashcards") -> str:
+def _add_to_section(content: str, section: str, blocks: List[str]) -> str:
     """
-    Add flashcards to content, creating a section if needed.
+    Insert serialized blocks at the end of a '## section', creating it if needed.
     
-    Appends to existing section or creates new one at the end.
+    The section ends at the next '## ' heading or at the end of the content.
     """
     section_header = f"## {section}"
+    section_start = content.find(section_header)
     
-    # Check if section exists
-    if section_header in content:
-        # Find section end (next ## or end of content)
-        section_start = content.index(section_header)
-        section_content_start = section_start + len(section_header)
-        
-        remaining = content[section_content_start:]
-        next_section = re.search(r'\n## ', remaining)
-        
-        if next_section:
-            insert_pos = section_content_start + next_section.start()
-        else:
-            insert_pos = len(content)
-        
-        # Add cards before next section
-        cards_text = "\n\n" + "\n\n".join(serialize_flashcard(c) for c in cards)
-        return content[:insert_pos] + cards_text + content[insert_pos:]
-    else:
+    if section_start == -1:
         # Add new section at the end
-        cards_text = f"\n\n{section_header}\n\n" + "\n\n".join(serialize_flashcard(c) for c in cards)
-        return content + cards_text
+        return content + f"\n\n{section_header}\n\n" + "\n\n".join(blocks)
+    
+    # Find section end (next ## or end of content)
+    insert_pos = content.find('\n## ', section_start + len(section_header))
+    if insert_pos == -1:
+        insert_pos = len(content)
+    
+    # Add blocks before next section
+    return content[:insert_pos] + "\n\n" + "\n\n".join(blocks) + content[insert_pos:]
+
+
+def add_flashcards_to_content(content: str, cards: List[Flashcard], section: str = "Flashcards") -> str:
+    """
+    Add flashcards to content, creating a section if needed.
+    
+    Appends to existing section or creates new one at the end.
+    """
+    return _add_to_section(content, section, [serialize_flashcard(c) for c in cards])
 
 
 def add_exercises_to_content(content: str, exercises: List[Exercise], section: str = "Exercises") -> str:
@@ -363,22 +443,4 @@ def add_exercises_to_content(content: str, exercises: List[Exercise], section: s
     
     Appends to existing section or creates new one at the end.
     """
-    section_header = f"## {section}"
-    
-    if section_header in content:
-        section_start = content.index(section_header)
-        section_content_start = section_start + len(section_header)
-        
-        remaining = content[section_content_start:]
-        next_section = re.search(r'\n## ', remaining)
-        
-        if next_section:
-            insert_pos = section_content_start + next_section.start()
-        else:
-            insert_pos = len(content)
-        
-        exercises_text = "\n\n" + "\n\n".join(serialize_exercise(e) for e in exercises)
-        return content[:insert_pos] + exercises_text + content[insert_pos:]
-    else:
-        exercises_text = f"\n\n{section_header}\n\n" + "\n\n".join(serialize_exercise(e) for e in exercises)
-        return content + exercises_text
+    return _add_to_section(content, section, [serialize_exercise(e) for e in exercises])
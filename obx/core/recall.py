@@ -1,10 +1,11 @@
 """Recall orchestration: scoring, item selection, and session management."""
 
+from functools import lru_cache
 from typing import List, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
 
-from obx.core.flashcard import Flashcard, FlashcardAlgorithm, calculate_memory_score
+from obx.core.flashcard import Flashcard, FlashcardAlgorithm, FlashcardState, calculate_memory_score
 from obx.core.exercise import Exercise, ExerciseSelector, calculate_exercise_score
 
 
@@ -68,6 +69,7 @@ class TopicTypeEstimator:
     }
     
     @classmethod
+    @lru_cache(maxsize=256)
     def estimate(cls, topic: str, note_content: str = "") -> float:
         """
         Estimate the ratio of exercises to flashcards.
@@ -76,6 +78,8 @@ class TopicTypeEstimator:
         - 0.0 = all flashcards
         - 0.5 = balanced
         - 1.0 = all exercises
+        
+        Memoized: selection asks for the same topic on every pick in a session.
         """
         combined = (topic + " " + note_content).lower()
         
@@ -101,6 +105,15 @@ class TopicTypeEstimator:
         return flashcard_weight, exercise_weight
 
 
+# Tier of each state when ordering due flashcards (see _due_priority_key)
+_DUE_RANKS = {
+    FlashcardState.NEW: 0,
+    FlashcardState.LEARNING: 1,
+    FlashcardState.RELEARNING: 2,
+    FlashcardState.REVIEWING: 3,
+}
+
+
 class RecallOrchestrator:
     """
     Orchestrates the selection of items during a recall session.
@@ -110,6 +123,21 @@ class RecallOrchestrator:
     2. Use the respective algorithm to select which one
     """
     
+    # Fixed priority of non-reviewing flashcards (higher = more urgent)
+    _STATE_PRIORITY = {
+        FlashcardState.NEW: 12.0,  # New cards highest priority
+        FlashcardState.LEARNING: 10.0,
+        FlashcardState.RELEARNING: 8.0,
+    }
+    
+    # Exercise priority indexed by grade (higher = more urgent)
+    _GRADE_PRIORITY = (
+        10.0,  # Not attempted - highest priority
+        8.0,   # Incorrect
+        3.0,   # Partial
+        1.0,   # Correct (for reinforcement)
+    )
+    
     @classmethod
     def select_next(
         cls,
@@ -118,14 +146,18 @@ class RecallOrchestrator:
         topic: str = "",
         flashcards_only: bool = False,
         exercises_only: bool = False,
+        now: Optional[datetime] = None,
     ) -> Optional[Union[Flashcard, Exercise]]:
         """
         Select the next item to present.
         
         Returns None if no items are due/available.
         """
+        if now is None:
+            now = datetime.now()
+        
         if flashcards_only:
-            return cls._get_due_flashcard(flashcards)
+            return cls._get_due_flashcard(flashcards, now)
         
         if exercises_only:
             return ExerciseSelector.get_next(exercises)
@@ -134,9 +166,21 @@ class RecallOrchestrator:
         fc_weight, ex_weight = TopicTypeEstimator.get_preference_weights(topic)
         
         # Get due flashcards and incomplete exercises
-        due_flashcard = cls._get_due_flashcard(flashcards)
+        due_flashcard = cls._get_due_flashcard(flashcards, now)
         next_exercise = ExerciseSelector.get_next(exercises)
         
+        return cls._choose(due_flashcard, next_exercise, fc_weight, ex_weight, now)
+    
+    @classmethod
+    def _choose(
+        cls,
+        due_flashcard: Optional[Flashcard],
+        next_exercise: Optional[Exercise],
+        fc_weight: float,
+        ex_weight: float,
+        now: datetime,
+    ) -> Optional[Union[Flashcard, Exercise]]:
+        """Pick between the best flashcard and the best exercise (either may be None)."""
         if due_flashcard is None and next_exercise is None:
             return None
         
@@ -147,7 +191,7 @@ class RecallOrchestrator:
             return due_flashcard
         
         # Both available - use priority scores
-        fc_priority = cls._flashcard_priority(due_flashcard) * (1 + fc_weight)
+        fc_priority = cls._flashcard_priority(due_flashcard, now) * (1 + fc_weight)
         ex_priority = cls._exercise_priority(next_exercise) * (1 + ex_weight)
         
         if fc_priority >= ex_priority:
@@ -155,60 +199,50 @@ class RecallOrchestrator:
         return next_exercise
     
     @classmethod
-    def _get_due_flashcard(cls, flashcards: List[Flashcard]) -> Optional[Flashcard]:
+    def _get_due_flashcard(cls, flashcards: List[Flashcard], now: datetime) -> Optional[Flashcard]:
         """Get the most urgent due flashcard using FSRS retrievability."""
-        now = datetime.now()
         due = [c for c in flashcards if c.is_due(now)]
         
         if not due:
             return None
         
-        # Sort by priority:
-        # 1. New cards first (need introduction)
-        # 2. Learning/relearning (short-term memory steps)
-        # 3. Reviewing cards by lowest retrievability (most forgotten first)
-        def priority_key(card: Flashcard):
-            state_priority = {
-                'new': 0,
-                'learning': 1,
-                'relearning': 2,
-                'reviewing': 3,
-            }
-            # For reviewing cards, use retrievability (lower = more urgent)
-            if card.state.value == 'reviewing':
-                return (state_priority['reviewing'], card.retrievability)
-            return (
-                state_priority.get(card.state.value, 3),
-                0.0,  # Learning/new cards treated equally within their tier
-            )
-        
-        return min(due, key=priority_key)
+        return min(due, key=lambda c: cls._due_priority_key(c, now))
     
     @classmethod
-    def _flashcard_priority(cls, card: Flashcard) -> float:
+    def _due_priority_key(cls, card: Flashcard, now: datetime) -> Tuple[int, float]:
+        """
+        Ordering of due flashcards (lowest first):
+        1. New cards first (need introduction)
+        2. Learning/relearning (short-term memory steps)
+        3. Reviewing cards by lowest retrievability (most forgotten first)
+        """
+        # For reviewing cards, use retrievability (lower = more urgent)
+        if card.state is FlashcardState.REVIEWING:
+            return (_DUE_RANKS[FlashcardState.REVIEWING], card.retrievability_at(now))
+        return (
+            _DUE_RANKS.get(card.state, 3),
+            0.0,  # Learning/new cards treated equally within their tier
+        )
+    
+    @classmethod
+    def _flashcard_priority(cls, card: Flashcard, now: datetime) -> float:
         """Calculate priority score for a flashcard using FSRS (higher = more urgent)."""
-        if card.state.value == 'new':
-            return 12.0  # New cards highest priority
-        if card.state.value == 'learning':
-            return 10.0
-        if card.state.value == 'relearning':
-            return 8.0
+        priority = cls._STATE_PRIORITY.get(card.state)
+        if priority is not None:
+            return priority
         
         # For reviewing cards, use inverse retrievability (lower R = higher priority)
         # R ranges from 0-1, so (1-R)*5 + 3 gives us 3-8 priority range
-        priority = (1 - card.retrievability) * 5 + 3
+        priority = (1 - card.retrievability_at(now)) * 5 + 3
         return priority
     
     @classmethod
     def _exercise_priority(cls, ex: Exercise) -> float:
         """Calculate priority score for an exercise (higher = more urgent)."""
-        grade_priority = {
-            0: 10.0,  # Not attempted - highest priority
-            1: 8.0,   # Incorrect
-            2: 3.0,   # Partial
-            3: 1.0,   # Correct (for reinforcement)
-        }
-        return grade_priority.get(ex.grade.value, 5.0)
+        grade = ex.grade
+        if 0 <= grade < len(cls._GRADE_PRIORITY):
+            return cls._GRADE_PRIORITY[grade]
+        return 5.0
     
     @classmethod
     def has_due_items(
@@ -219,12 +253,13 @@ class RecallOrchestrator:
         exercises_only: bool = False,
     ) -> bool:
         """Check if there are any due items remaining."""
+        now = datetime.now()
         if flashcards_only:
-            return cls._get_due_flashcard(flashcards) is not None
+            return cls._get_due_flashcard(flashcards, now) is not None
         if exercises_only:
             return ExerciseSelector.get_next(exercises) is not None
         return (
-            cls._get_due_flashcard(flashcards) is not None
+            cls._get_due_flashcard(flashcards, now) is not None
             or ExerciseSelector.get_next(exercises) is not None
         )
     
@@ -236,14 +271,18 @@ class RecallOrchestrator:
         topic: str = "",
         flashcards_only: bool = False,
         exercises_only: bool = False,
+        now: Optional[datetime] = None,
     ) -> Optional[Union[Flashcard, Exercise]]:
         """
         Select next item for EARLY review (when all due items are done).
         
         Prioritizes flashcards closest to their due date (soon-to-be-due first).
         """
+        if now is None:
+            now = datetime.now()
+        
         if flashcards_only:
-            return cls._get_early_review_flashcard(flashcards)
+            return cls._get_early_review_flashcard(flashcards, now)
         
         if exercises_only:
             # For exercises, return one that's already attempted for reinforcement
@@ -253,7 +292,7 @@ class RecallOrchestrator:
             return None
         
         # Get early review candidates
-        early_flashcard = cls._get_early_review_flashcard(flashcards)
+        early_flashcard = cls._get_early_review_flashcard(flashcards, now)
         
         if early_flashcard is None:
             return None
@@ -261,7 +300,7 @@ class RecallOrchestrator:
         return early_flashcard
     
     @classmethod
-    def _get_early_review_flashcard(cls, flashcards: List[Flashcard]) -> Optional[Flashcard]:
+    def _get_early_review_flashcard(cls, flashcards: List[Flashcard], now: datetime) -> Optional[Flashcard]:
         """
         Get the best flashcard for early review using FSRS retrievability.
         
@@ -269,21 +308,19 @@ class RecallOrchestrator:
         This makes early review more effective - you review what you're about
         to forget anyway, rather than cards you still remember well.
         """
-        now = datetime.now()
-        
-        # Get non-due reviewing cards
-        not_due_reviewing = [
-            c for c in flashcards 
-            if not c.is_due(now) and c.state.value == 'reviewing'
-        ]
-        
-        if not not_due_reviewing:
-            return None
-        
-        # Sort by retrievability (lowest first = most likely to forget soon)
-        # This is the key insight: early review is most useful for cards
-        # that are just about to drop below your target retention
-        return min(not_due_reviewing, key=lambda c: c.retrievability)
+        # Single pass over non-due reviewing cards, keeping the lowest
+        # retrievability (most likely to forget soon). This is the key insight:
+        # early review is most useful for cards that are just about to drop
+        # below your target retention
+        best = None
+        best_r = float('inf')
+        for c in flashcards:
+            if c.state is not FlashcardState.REVIEWING or c.is_due(now):
+                continue
+            r = c.retrievability_at(now)
+            if r < best_r:
+                best, best_r = c, r
+        return best
     
     @classmethod
     def get_session_items(
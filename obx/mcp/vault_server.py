@@ -1,21 +1,36 @@
-from typing import Optional, List
-import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, List, Tuple, Union
 
 from mcp.server.fastmcp import FastMCP
 
-from obx.rag.engine import RAG
-from obx.utils.fs import read_note, list_note_headers, write_note, list_notes, fuzzy_find
+from obx.core.learning_parser import ParsedItem, parse_exercises, parse_flashcards
+from obx.rag import daemon
+from obx.rag.engine import RAG, INDEX_PATH
+from obx.utils.fs import (
+    fuzzy_find,
+    get_learning_scores,
+    list_note_headers,
+    list_notes,
+    locate_note,
+    read_note,
+    write_note,
+)
 
 
 mcp = FastMCP("obx-vault")
 _rag_engine: Optional[RAG] = None
 
+# Control chars (except tab, LF and CR) that can break JSON parsing on some providers
+_CONTROL_CHARS = [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20)]
+_CLEAN_TABLE = str.maketrans({c: " " for c in _CONTROL_CHARS})
+
 
 def _clean(text: str) -> str:
-    # Remove control chars that can break JSON parsing on some providers.
     if not text:
         return ""
-    return re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F]", " ", text)
+    return text.translate(_CLEAN_TABLE)
 
 
 def _get_rag() -> RAG:
@@ -32,10 +47,12 @@ def search_vault(query: str, limit: int = 7, weights: float = 0.5) -> str:
     Uses hybrid search (semantic + keyword).
     """
     try:
-        rag_engine = _get_rag()
-        if not rag_engine.index_exists():
+        if not INDEX_PATH.exists():
             return "Search index not found."
-        results = rag_engine.search(query, limit=limit, weights=weights)
+        # This server is started per agent run, so prefer the daemon's loaded engine
+        results = daemon.search(query, limit=limit, weights=weights)
+        if results is None:
+            results = _get_rag().search(query, limit=limit, weights=weights)
     except Exception as e:
         return f"Error: vault search unavailable ({e})."
     if not results:
@@ -86,19 +103,39 @@ def fuzzy_find_tool(filename: str) -> str:
 
 # --- Learning Tools ---
 
+@lru_cache(maxsize=128)
+def _parsed_flashcards(path: Path, mtime_ns: int, size: int) -> Tuple[ParsedItem, ...]:
+    # mtime and size are only part of the key, so an edited note is re-read
+    return tuple(parse_flashcards(path.read_text(encoding="utf-8")))
+
+
+@lru_cache(maxsize=128)
+def _parsed_exercises(path: Path, mtime_ns: int, size: int) -> Tuple[ParsedItem, ...]:
+    return tuple(parse_exercises(path.read_text(encoding="utf-8")))
+
+
+def _note_items(filename: str, parsed_items: Callable[[Path, int, int], Tuple[ParsedItem, ...]]) -> Union[str, Tuple[ParsedItem, ...]]:
+    """Parsed items of a note, shared across tool calls until the file changes."""
+    file_path = locate_note(filename)
+    if file_path is None:
+        return read_note(filename)  # Not-found error message
+    try:
+        stat = file_path.stat()
+        return parsed_items(file_path, stat.st_mtime_ns, stat.st_size)
+    except Exception as e:
+        return f"Error reading file: {e}"
+
+
 @mcp.tool()
 def get_flashcards_tool(filename: str) -> str:
     """
     Get all flashcards from a note.
     Returns flashcards with their current SRS state.
     """
-    from obx.core.learning_parser import parse_flashcards
-    
-    content = read_note(filename)
-    if content.startswith("Error:"):
-        return content
+    parsed = _note_items(filename, _parsed_flashcards)
+    if isinstance(parsed, str):
+        return parsed
     
-    parsed = parse_flashcards(content)
     if not parsed:
         return "No flashcards found in this note."
     
@@ -119,13 +156,10 @@ def get_exercises_tool(filename: str) -> str:
     Get all exercises from a note.
     Returns exercises with their current grade and progress.
     """
-    from obx.core.learning_parser import parse_exercises
+    parsed = _note_items(filename, _parsed_exercises)
+    if isinstance(parsed, str):
+        return parsed
     
-    content = read_note(filename)
-    if content.startswith("Error:"):
-        return content
-    
-    parsed = parse_exercises(content)
     if not parsed:
         return "No exercises found in this note."
     
@@ -145,8 +179,6 @@ def get_learning_status_tool(filename: str) -> str:
     Get the overall learning status for a note.
     Returns memory and exercise scores from YAML frontmatter.
     """
-    from obx.utils.fs import get_learning_scores
-    
     scores = get_learning_scores(filename)
     return (
         f"Memory Score: {scores['memory']:.0%}\n"
@@ -159,14 +191,10 @@ def get_due_flashcards_tool(filename: str) -> str:
     """
     Get flashcards that are currently due for review.
     """
-    from obx.core.learning_parser import parse_flashcards
-    from datetime import datetime
-    
-    content = read_note(filename)
-    if content.startswith("Error:"):
-        return content
+    parsed = _note_items(filename, _parsed_flashcards)
+    if isinstance(parsed, str):
+        return parsed
     
-    parsed = parse_flashcards(content)
     now = datetime.now()
     due = [p for p in parsed if p.item.is_due(now)]
     
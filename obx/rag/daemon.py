@@ -0,0 +1,191 @@
+"""
+Background search daemon.
+
+Keeps a loaded RAG engine (embedding model + index) alive between CLI invocations
+so `obx search` does not pay the model/index load on every call. Clients talk to
+it over a unix socket with one newline-terminated JSON request per connection:
+
+    {"method": "search", "params": {"query": "...", "limit": 15}}
+
+and receive {"result": ...} or {"error": "..."}.
+
+Run directly with `python -m obx.rag.daemon`; the CLI starts it lazily.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from obx.core.config import settings, OBX_DIR
+
+SOCKET_PATH = Path(os.environ.get("XDG_RUNTIME_DIR") or OBX_DIR) / "obx.sock"
+# Held for the daemon's lifetime so concurrently spawned daemons exit before loading anything
+LOCK_PATH = SOCKET_PATH.with_suffix(".lock")
+IDLE_TIMEOUT = 15 * 60  # Exit after this many seconds without requests
+CLIENT_TIMEOUT = 30.0
+
+
+def _available() -> bool:
+    return hasattr(socket, "AF_UNIX") and settings.search_daemon
+
+
+def _request(method: str, params: Dict[str, Any]) -> Any:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CLIENT_TIMEOUT)
+        sock.connect(str(SOCKET_PATH))
+        sock.sendall(json.dumps({"method": method, "params": params}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def _spawn() -> None:
+    subprocess.Popen(
+        [sys.executable, "-m", "obx.rag.daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def search(query: str, limit: int = 5, weights: float = 0.5) -> Optional[List[Dict[str, Any]]]:
+    """
+    Search through the daemon.
+
+    Returns None when the daemon is disabled or not running (in which case it is
+    started in the background for next time) so callers can fall back to an
+    in-process RAG.
+    """
+    if not _available():
+        return None
+    try:
+        return _request("search", {"query": query, "limit": limit, "weights": weights})
+    except (FileNotFoundError, ConnectionRefusedError):
+        _spawn()
+        return None
+    except (OSError, ValueError, RuntimeError):
+        return None
+
+
+def _is_running() -> bool:
+    try:
+        _request("ping", {})
+        return True
+    except Exception:
+        return False
+
+
+class _Server:
+    def __init__(self):
+        # The engine (embedding model + index) is loaded on the first search, after
+        # the socket is bound, so clients never see a loading daemon as missing
+        self._rag = None
+        self._index_mtime: Optional[float] = None
+
+    @property
+    def rag(self):
+        if self._rag is None:
+            from obx.rag.engine import RAG
+            self._rag = RAG()
+            self._index_mtime = self._current_index_mtime()
+        return self._rag
+
+    def _current_index_mtime(self) -> Optional[float]:
+        try:
+            return self.rag.metadata_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _refresh_if_reindexed(self) -> None:
+        # Another process (obx index) may have rewritten the index since we loaded it
+        if self._rag is None:
+            return
+        mtime = self._current_index_mtime()
+        if mtime != self._index_mtime:
+            with self.rag._lock:
+                self.rag.metadata_store = self.rag._load_metadata()
+                self.rag._index_loaded = False
+                self.rag._search_cache.clear()
+            self._index_mtime = mtime
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        method = request.get("method")
+        params = request.get("params") or {}
+        if method == "ping":
+            return "pong"
+        if method == "search":
+            self._refresh_if_reindexed()
+            results = self.rag.search(
+                params["query"],
+                limit=params.get("limit", 5),
+                weights=params.get("weights", 0.5),
+            )
+            for r in results:
+                r["score"] = float(r.get("score", 0.0))
+            return results
+        raise ValueError(f"Unknown method: {method}")
+
+    def serve(self) -> None:
+        SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(LOCK_PATH, "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return  # Another daemon holds the lock
+                # Holding the lock, any existing socket is left over from a dead daemon
+                SOCKET_PATH.unlink(missing_ok=True)
+            elif SOCKET_PATH.exists():
+                if _is_running():
+                    return  # Another daemon won the race
+                SOCKET_PATH.unlink()
+            self._listen()
+
+    def _listen(self) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(SOCKET_PATH))
+            os.chmod(SOCKET_PATH, 0o600)
+            server.listen()
+            server.settimeout(IDLE_TIMEOUT)
+            try:
+                while True:
+                    try:
+                        conn, _ = server.accept()
+                    except socket.timeout:
+                        break
+                    # A client that never sends its request must not stall the daemon
+                    conn.settimeout(CLIENT_TIMEOUT)
+                    try:
+                        with conn, conn.makefile("rwb") as f:
+                            try:
+                                response = {"result": self.handle(json.loads(f.readline()))}
+                            except Exception as e:
+                                response = {"error": str(e)}
+                            f.write(json.dumps(response).encode("utf-8") + b"\n")
+                            f.flush()
+                    except OSError:
+                        continue  # Client timed out or hung up; keep serving
+            finally:
+                SOCKET_PATH.unlink(missing_ok=True)
+
+
+def main() -> None:
+    if not hasattr(socket, "AF_UNIX") or not settings.is_configured:
+        return
+    _Server().serve()
+
+
+if __name__ == "__main__":
+    main()
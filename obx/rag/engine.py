@@ -1,10 +1,17 @@
 import shutil
 import os
 import json
+import hashlib
 import time
 import asyncio
 import threading
 import logging
+import re
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
@@ -17,27 +24,94 @@ Embedder = None
 
 from rich.progress import Progress
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 from obx.core.config import settings, OBX_DIR
 from obx.utils.ui import console
+from obx.utils.fs import walk_vault
+
+# Recent raw search hits kept per (query, limit, weights); repeated queries
+# skip the query embedding and index lookup
+SEARCH_CACHE_SIZE = 128
+
+# Chunks embedded per upsert during ingest; bounds memory on large vaults
+INDEX_BATCH_SIZE = 256
+
+INDEX_PATH = OBX_DIR / "txtai_index"
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write via a temp file and rename, so an interrupted save never truncates path."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Markdown header line; [^\S\n] keeps the separator from running onto the next line
+HEADER_PATTERN = re.compile(r'^(#{1,6})[^\S\n]+(.*)', re.MULTILINE)
+
+@dataclass(slots=True)
+class ChunkMeta:
+    """Sidecar metadata for one indexed chunk (slots: far lighter than a dict per chunk)."""
+    text: str
+    source: str
+    path: str
+    type: str
+    chunk_index: int
+    header: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "source": self.source,
+            "path": self.path,
+            "type": self.type,
+            "chunk_index": self.chunk_index,
+            "header": self.header,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChunkMeta":
+        return cls(
+            text=data.get("text", ""),
+            source=data.get("source", "Unknown"),
+            path=data.get("path", ""),
+            type=data.get("type", ""),
+            chunk_index=data.get("chunk_index", 0),
+            header=data.get("header"),
+        )
+
 
 class RAG:
     def __init__(self):
-        global Embeddings, SemanticChunker, MarkItDown, Embedder
+        global Embeddings, SemanticChunker, Embedder
         
         # Lazy imports for heavy libraries
         if Embeddings is None:
             from txtai.embeddings import Embeddings # type: ignore
         if SemanticChunker is None:
             from chonkie import SemanticChunker # type: ignore
-        if MarkItDown is None:
-            try:
-                from markitdown import MarkItDown # type: ignore
-            except ImportError:
-                MarkItDown = None
+        # MarkItDown (PDF stack) is imported on first use, see the markitdown property
 
-        self.index_path = OBX_DIR / "txtai_index"
+        self.index_path = INDEX_PATH
         self.tracker_path = OBX_DIR / "index_tracker.json"
-        self.metadata_path = OBX_DIR / "metadata_store.json"
+        self.metadata_path = OBX_DIR / "metadata_store.jsonl"
+        self._legacy_metadata_path = OBX_DIR / "metadata_store.json"
         
         if not Embeddings: raise ImportError("txtai not installed.")
         if not SemanticChunker: raise ImportError("chonkie not installed.")
@@ -49,10 +123,15 @@ class RAG:
         model = settings.embedding_model
         
         # Base config: keyword=True (Sparse/BM25), content=True (store metadata)
+        # encodebatch: chunks per model forward pass / API request during indexing
         self.txtai_config = {
             "content": True,
-            "keyword": True
+            "keyword": True,
+            "encodebatch": settings.embedding_batch_size,
         }
+        if settings.embedding_quantize:
+            # Scalar quantization of the stored vectors (faiss/numpy/torch backends)
+            self.txtai_config["quantize"] = settings.embedding_quantize
         
         # Provider configuration
         if provider == "sentence-transformers":
@@ -101,14 +180,32 @@ class RAG:
         self.embeddings = Embeddings(self.txtai_config)
         
         self.chunker = SemanticChunker(threshold=0.7, chunk_size=512)
-        self.markitdown = MarkItDown() if MarkItDown else None
+        # The chunker holds an embedding model that is not known to be thread-safe
+        self._chunker_lock = threading.Lock()
+        self._markitdown = None
         
         self.tracker = self._load_tracker()
+        self._metadata_log_lines = 0
+        self._metadata_pending: List[bytes] = []
         self.metadata_store = self._load_metadata()
         self._index_loaded = False
+        self._search_cache: "OrderedDict[Tuple[str, int, float], List[Any]]" = OrderedDict()
         # Guard txtai embeddings against concurrent access (non-thread-safe in practice)
         self._lock = threading.RLock()
 
+    @property
+    def markitdown(self):
+        """MarkItDown converter, built on first access; None if markitdown is not installed."""
+        global MarkItDown
+        if self._markitdown is None:
+            if MarkItDown is None:
+                try:
+                    from markitdown import MarkItDown # type: ignore
+                except ImportError:
+                    return None
+            self._markitdown = MarkItDown()
+        return self._markitdown
+
     def _setup_env(self):
         if settings.openai_api_key: os.environ["OPENAI_API_KEY"] = settings.openai_api_key
         if settings.gemini_api_key:
@@ -127,71 +224,130 @@ class RAG:
         os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
         os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
 
-    def _load_tracker(self) -> Dict[str, float]:
-        if self.tracker_path.exists():
-            try:
-                return json.loads(self.tracker_path.read_text())
-            except:
-                return {}
-        return {}
+    def _load_tracker(self) -> Dict[str, Any]:
+        # No exists() pre-check: a missing file is just one failed open
+        try:
+            return _json_loads(self.tracker_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
 
     def _save_tracker(self):
-        self.tracker_path.write_text(json.dumps(self.tracker, indent=2))
+        _atomic_write_bytes(self.tracker_path, _json_dumps(self.tracker))
         
-    def _load_metadata(self) -> Dict[str, Any]:
-        if self.metadata_path.exists():
+    def _tracker_entry(self, key: str) -> Tuple[Optional[float], Optional[str]]:
+        """Return (mtime, sha256) recorded for a file. Legacy entries only store the mtime."""
+        entry = self.tracker.get(key)
+        if entry is None:
+            return None, None
+        if isinstance(entry, (int, float)):
+            return float(entry), None
+        return entry[0], entry[1]
+
+    @staticmethod
+    def _file_digest(path: Path) -> str:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def _load_metadata(self) -> Dict[str, ChunkMeta]:
+        """
+        Replay the metadata log: one {"id", "meta"} record per line, later lines
+        win, and {"id", "deleted": true} removes an entry.
+        """
+        store: Dict[str, ChunkMeta] = {}
+        self._metadata_log_lines = 0
+        try:
+            with open(self.metadata_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = _json_loads(line)
+                    except ValueError:
+                        # Torn last line from an interrupted append; the next
+                        # save rewrites the log instead of appending after it
+                        self._metadata_log_lines = -1
+                        continue
+                    if self._metadata_log_lines >= 0:
+                        self._metadata_log_lines += 1
+                    if record.get("deleted"):
+                        store.pop(record["id"], None)
+                    else:
+                        store[record["id"]] = ChunkMeta.from_dict(record["meta"])
+        except FileNotFoundError:
+            # Pre-JSONL store; rewritten as a log on the next save
             try:
-                return json.loads(self.metadata_path.read_text())
-            except:
+                legacy = _json_loads(self._legacy_metadata_path.read_bytes())
+            except (OSError, ValueError):
                 return {}
-        return {}
+            return {k: ChunkMeta.from_dict(v) for k, v in legacy.items()}
+        except OSError:
+            return {}
+        return store
 
-    def _save_metadata(self):
-        self.metadata_path.write_text(json.dumps(self.metadata_store, indent=2))
+    def _set_metadata(self, doc_id: str, metadata: Dict[str, Any]) -> None:
+        self.metadata_store[doc_id] = ChunkMeta.from_dict(metadata)
+        self._metadata_pending.append(_json_dumps({"id": doc_id, "meta": metadata}))
+
+    def _delete_metadata(self, doc_id: str) -> None:
+        del self.metadata_store[doc_id]
+        self._metadata_pending.append(_json_dumps({"id": doc_id, "deleted": True}))
 
-    def _get_vault_files(self) -> List[Path]:
+    def _save_metadata(self):
+        """Append pending changes, compacting once over 30% of the log is dead."""
+        total = self._metadata_log_lines + len(self._metadata_pending)
+        if (
+            self._metadata_log_lines < 0
+            or self._legacy_metadata_path.exists()
+            or total * 0.7 > len(self.metadata_store)
+        ):
+            lines = [_json_dumps({"id": k, "meta": v.to_dict()}) for k, v in self.metadata_store.items()]
+            _atomic_write_bytes(self.metadata_path, b"".join(line + b"\n" for line in lines))
+            self._legacy_metadata_path.unlink(missing_ok=True)
+            self._metadata_log_lines = len(lines)
+        elif self._metadata_pending:
+            with open(self.metadata_path, "ab") as f:
+                f.write(b"".join(line + b"\n" for line in self._metadata_pending))
+            self._metadata_log_lines = total
+        self._metadata_pending = []
+
+    def _get_vault_files(self) -> List[Tuple[Path, os.DirEntry]]:
         if not settings.vault_path:
             return []
-        
-        all_files = list(settings.vault_path.rglob("*.md")) + list(settings.vault_path.rglob("*.pdf"))
-        
-        if not settings.exclude_folders:
-            return all_files
-            
-        # Convert exclusion strings to absolute paths
-        excluded_paths = [settings.vault_path / ex for ex in settings.exclude_folders]
-        
-        filtered_files = []
-        for f in all_files:
-            try:
-                # Check if file is inside any excluded directory
-                is_excluded = False
-                for ex_path in excluded_paths:
-                    if f.is_relative_to(ex_path):
-                        is_excluded = True
-                        break
-                
-                if not is_excluded:
-                    filtered_files.append(f)
-                    
-            except Exception:
-                continue
-                
-        return filtered_files
+
+        # Excluded folders are pruned during the walk rather than filtered afterwards.
+        # PDFs are not indexed (they are passed to the model as binary attachments,
+        # not OCR'd), so they are left out here rather than hashed on every run.
+        return [
+            (path, entry)
+            for path, entry in walk_vault(settings.vault_path, settings.exclude_folders)
+            if entry.name.endswith(".md")
+        ]
+
+    @staticmethod
+    def _remove_trees(paths: List[Path]) -> None:
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
 
     def clear(self):
         with self._lock:
+            # Renaming is atomic and instant; the (possibly large) tree is
+            # deleted off-thread, together with leftovers from interrupted runs
+            doomed = list(self.index_path.parent.glob(f"{self.index_path.name}.deleting-*"))
             if self.index_path.exists():
-                shutil.rmtree(self.index_path)
+                doomed.append(self.index_path.rename(
+                    self.index_path.with_name(f"{self.index_path.name}.deleting-{time.time_ns()}")
+                ))
+            if doomed:
+                threading.Thread(target=self._remove_trees, args=(doomed,), name="obx-index-clear").start()
             if self.tracker_path.exists():
                 self.tracker_path.unlink()
-            if self.metadata_path.exists():
-                self.metadata_path.unlink()
+            self.metadata_path.unlink(missing_ok=True)
+            self._legacy_metadata_path.unlink(missing_ok=True)
+            self._metadata_log_lines = 0
+            self._metadata_pending = []
             
             self.tracker = {}
             self.metadata_store = {}
             # Re-init with config
             self.embeddings = Embeddings(self.txtai_config)
+            self._search_cache.clear()
             self._index_loaded = True
             console.print("[green]Index cleared.[/green]")
 
@@ -208,88 +364,208 @@ class RAG:
         console.print(f"[dim]Scanning vault at {settings.vault_path}...[/dim]")
         files = self._get_vault_files()
 
+        # mtime first; only hash files whose mtime moved, and only re-embed
+        # files whose content hash actually changed
         to_process = []
-        for f in files:
-            mtime = f.stat().st_mtime
-            if str(f) not in self.tracker or self.tracker[str(f)] < mtime:
-                to_process.append(f)
+        new_tracker = self.tracker.copy()
+        touched = False
+
+        # Notes deleted, renamed or newly excluded since the last run
+        present = {str(f) for f, _ in files}
+        removed = 0
+        for key in [k for k in self.tracker if k not in present]:
+            removed += self._drop_chunks(Path(key))
+            del new_tracker[key]
+
+        for f, entry in files:
+            key = str(f)
+            st = entry.stat()  # Cached on the DirEntry by the scandir walk
+            if st.st_size == 0 and key not in self.tracker:
+                continue  # Nothing to hash or chunk, and nothing indexed to remove
+            mtime = st.st_mtime
+            seen_mtime, seen_digest = self._tracker_entry(key)
+            if seen_mtime == mtime:
+                continue
+            digest = self._file_digest(f)
+            if digest == seen_digest:
+                new_tracker[key] = [mtime, digest]
+                touched = True
+                continue
+            to_process.append((f, mtime, digest))
+
+        skipped = len(files) - len(to_process)
+        if skipped:
+            console.print(f"[dim]Skipped {skipped}/{len(files)} unchanged files.[/dim]")
 
         if not to_process:
+            if removed:
+                console.print(f"[cyan]Saving index ({removed} chunks of removed notes deleted)...[/cyan]")
+                await self._save_all(new_tracker)
+            elif touched:
+                self.tracker = new_tracker
+                self._save_tracker()
             console.print("[yellow]No new or modified files to index.[/yellow]")
             return
 
         console.print(f"[green]Found {len(to_process)} files to process.[/green]")
 
         documents_to_index = []
-        new_tracker = self.tracker.copy()
+        indexed = 0
 
-        with Progress() as progress:
+        # Reading and chunking run ahead on worker threads while this thread
+        # records metadata and embeds; the window bounds how far they get ahead
+        workers = min(8, os.cpu_count() or 1)
+        pending = deque()
+        queue = iter(to_process)
+
+        with Progress() as progress, ThreadPoolExecutor(max_workers=workers) as pool:
             task = progress.add_task("[cyan]Processing files...", total=len(to_process))
 
-            for file_path in to_process:
-                try:
-                    text_content = ""
-                    if file_path.suffix.lower() == ".md":
-                        text_content = file_path.read_text(encoding="utf-8")
-                    elif file_path.suffix.lower() == ".pdf":
-                        # Skip PDFs - they should be passed directly to the model as binary
-                        # attachments, not indexed via OCR
-                        progress.advance(task)
-                        continue
+            def submit_next() -> None:
+                item = next(queue, None)
+                if item is not None:
+                    pending.append((*item, pool.submit(self._chunk_file, item[0])))
 
-                    if not text_content.strip():
+            for _ in range(workers * 2):
+                submit_next()
+
+            while pending:
+                file_path, mtime, digest, future = pending.popleft()
+                submit_next()
+                try:
+                    documents = future.result()
+                    if documents is None:
+                        # Emptied note: its old chunks must not outlive it
+                        removed += self._drop_chunks(file_path)
+                        new_tracker[str(file_path)] = [mtime, digest]
                         progress.advance(task)
                         continue
 
-                    chunks = self.chunker.chunk(text_content)
-
-                    # Extract headers from the text for better source attribution
-                    headers = self._extract_headers(text_content)
-
-                    for i, chunk in enumerate(chunks):
-                        doc_id = f"{file_path.name}#{i}"
-
-                        # Find the nearest header for this chunk
-                        chunk_header = self._find_nearest_header(chunk.start_index, headers)
-
-                        metadata = {
-                            "text": chunk.text,
-                            "source": file_path.name,
-                            "path": str(file_path),
-                            "type": file_path.suffix,
-                            "chunk_index": i,
-                            "header": chunk_header
-                        }
-
+                    for doc_id, metadata in documents:
                         # Store metadata in sidecar
-                        self.metadata_store[doc_id] = metadata
+                        self._set_metadata(doc_id, metadata)
 
                         # For txtai, we just need text for hybrid search
                         # (uid, data, vector) -> (uid, metadata, None)
                         # We still pass metadata to txtai so it indexes 'text' field
                         documents_to_index.append((doc_id, metadata, None))
 
-                    new_tracker[str(file_path)] = file_path.stat().st_mtime
+                    # Chunks past the new end belong to an older, longer version
+                    removed += self._drop_chunks(file_path, start=len(documents))
+
+                    new_tracker[str(file_path)] = [mtime, digest]
 
                 except Exception as e:
                     console.print(f"[red]Error processing {file_path.name}: {e}[/red]")
 
                 progress.advance(task)
 
-        if documents_to_index:
-            console.print(f"[cyan]Indexing {len(documents_to_index)} chunks...[/cyan]")
+                if len(documents_to_index) >= INDEX_BATCH_SIZE:
+                    indexed += self._upsert_batch(documents_to_index)
+                    documents_to_index = []
 
-            with self._lock:
-                self.embeddings.index(documents_to_index)
-                self.embeddings.save(str(self.index_path))
+        if documents_to_index:
+            indexed += self._upsert_batch(documents_to_index)
 
-            self.tracker = new_tracker
-            self._save_tracker()
-            self._save_metadata()
+        if indexed or removed:
+            console.print(f"[cyan]Saving index ({indexed} chunks updated, {removed} deleted)...[/cyan]")
+            await self._save_all(new_tracker)
             console.print("[green]Indexing complete.[/green]")
         else:
+            if new_tracker != self.tracker:
+                self.tracker = new_tracker
+                self._save_tracker()
             console.print("[yellow]No valid chunks extracted.[/yellow]")
+
+    async def _save_all(self, new_tracker: Dict[str, Any]) -> None:
+        # Blocking disk writes run off the event loop; they stay sequential
+        # so the tracker never claims files the saved index lacks
+        await asyncio.to_thread(self._save_index)
+
+        self.tracker = new_tracker
+        await asyncio.to_thread(self._save_tracker)
+        await asyncio.to_thread(self._save_metadata)
+
+    def _drop_chunks(self, file_path: Path, start: int = 0) -> int:
+        """
+        Delete a note's indexed chunks from chunk `start` on, from both the index
+        and the metadata store. Returns how many were deleted.
+
+        Chunk ids are keyed on the file name, so ids whose metadata points at
+        another note of the same name are left alone.
+        """
+        source, path = file_path.name, str(file_path)
+        doomed = []
+        i = start
+        while True:
+            meta = self.metadata_store.get(f"{source}#{i}")
+            if meta is None or meta.path != path:
+                break
+            doomed.append(f"{source}#{i}")
+            i += 1
+        if doomed:
+            for doc_id in doomed:
+                self._delete_metadata(doc_id)
+            with self._lock:
+                self.embeddings.delete(doomed)
+                self._search_cache.clear()
+        return len(doomed)
             
+    def _chunk_file(self, file_path: Path) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Read and chunk one note into (doc_id, metadata) pairs.
+
+        Returns None for files that are not indexed (empty notes). Runs on
+        worker threads: reading and header extraction overlap, while the shared
+        chunker is called under its own lock.
+        """
+        text_content = ""
+        if file_path.suffix.lower() == ".md":
+            text_content = file_path.read_text(encoding="utf-8")
+
+        if not text_content.strip():
+            return None
+
+        with self._chunker_lock:
+            chunks = self.chunker.chunk(text_content)
+
+        # Extract headers from the text for better source attribution
+        headers = self._extract_headers(text_content)
+
+        # One str per file for the per-chunk fields, shared by every chunk
+        source, path, suffix = file_path.name, str(file_path), file_path.suffix
+        documents = []
+        for i, chunk in enumerate(chunks):
+            metadata = {
+                "text": chunk.text,
+                "source": source,
+                "path": path,
+                "type": suffix,
+                "chunk_index": i,
+                # Find the nearest header for this chunk
+                "header": self._find_nearest_header(chunk.start_index, headers),
+            }
+            documents.append((f"{source}#{i}", metadata))
+        return documents
+
+    def _save_index(self) -> None:
+        with self._lock:
+            self.embeddings.save(str(self.index_path))
+
+    def _upsert_batch(self, documents: List[Tuple[str, Dict[str, Any], None]]) -> int:
+        """
+        Embed one batch of chunks into the index.
+
+        Sorting by text length keeps similarly sized chunks in the same model
+        batch, so short chunks are not padded up to the longest one.
+        """
+        documents.sort(key=lambda doc: len(doc[1]["text"]))
+        with self._lock:
+            # upsert appends to / updates the loaded index (index() would replace it)
+            self.embeddings.upsert(documents)
+            self._search_cache.clear()
+        return len(documents)
+
     def index_exists(self) -> bool:
         return self.index_path.exists()
 
@@ -297,19 +573,10 @@ class RAG:
         """Extract headers from markdown text.
         Returns list of (char_position, header_level, header_text) tuples.
         """
-        import re
-        headers = []
-        current_pos = 0
-        
-        for line in text.split('\n'):
-            match = re.match(r'^(#{1,6})\s+(.*)', line)
-            if match:
-                level = match.group(1)
-                header_text = match.group(2).strip()
-                headers.append((current_pos, level, header_text))
-            current_pos += len(line) + 1  # +1 for newline
-        
-        return headers
+        return [
+            (m.start(), m.group(1), m.group(2).strip())
+            for m in HEADER_PATTERN.finditer(text)
+        ]
     
     def _find_nearest_header(self, chunk_start: int, headers: List[Tuple[int, str, str]]) -> Optional[str]:
         """Find the nearest header before the chunk position."""
@@ -317,14 +584,8 @@ class RAG:
             return None
         
         # Find the last header that appears before or at the chunk start
-        nearest = None
-        for pos, level, text in headers:
-            if pos <= chunk_start:
-                nearest = text
-            else:
-                break
-        
-        return nearest
+        idx = bisect_right(headers, chunk_start, key=itemgetter(0))
+        return headers[idx - 1][2] if idx else None
 
     def search(self, query: str, limit: int = 5, weights: float = 0.5) -> List[Dict[str, Any]]:
         with self._lock:
@@ -335,7 +596,15 @@ class RAG:
                 self.embeddings.load(str(self.index_path))
                 self._index_loaded = True
                 
-            results = self.embeddings.search(query, limit, weights=weights)
+            key = (query, limit, weights)
+            results = self._search_cache.get(key)
+            if results is None:
+                results = self.embeddings.search(query, limit, weights=weights)
+                self._search_cache[key] = results
+                if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+            else:
+                self._search_cache.move_to_end(key)
         
         enriched = []
         for r in results:
@@ -346,9 +615,9 @@ class RAG:
                  uid, score = r
                  
              # Retrieve metadata from sidecar store
-             meta = self.metadata_store.get(uid, {})
-             if meta:
-                 result_item = meta.copy()
+             meta = self.metadata_store.get(uid)
+             if meta is not None:
+                 result_item = meta.to_dict()
                  result_item['score'] = score
                  # Ensure 'text' is present if not in meta (should be)
                  enriched.append(result_item)
@@ -2,25 +2,77 @@ import difflib
 from rich.console import Console
 from rich.text import Text
 from rich.panel import Panel
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 
 console = Console()
 
+
+def _format_range(start: int, stop: int) -> str:
+    # Same "start,length" convention as difflib's unified hunks
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _unified_diff(a: List[str], b: List[str], fromfile: str, tofile: str, n: int = 3) -> Iterator[str]:
+    """
+    difflib.unified_diff with a fast path for pure insertions and deletions.
+    
+    Proposals only ever insert text, so after trimming the common leading and
+    trailing lines one side is usually empty and the single hunk can be written
+    directly instead of running SequenceMatcher over the whole note.
+    """
+    prefix = 0
+    limit = min(len(a), len(b))
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    
+    a_end, b_end = len(a) - suffix, len(b) - suffix
+    if prefix == a_end and prefix == b_end:
+        return  # Identical
+    if prefix != a_end and prefix != b_end:
+        yield from difflib.unified_diff(a, b, fromfile=fromfile, tofile=tofile, lineterm="")
+        return
+    
+    start = max(0, prefix - n)
+    a_stop = min(len(a), a_end + n)
+    b_stop = min(len(b), b_end + n)
+    yield f"--- {fromfile}"
+    yield f"+++ {tofile}"
+    yield f"@@ -{_format_range(start, a_stop)} +{_format_range(start, b_stop)} @@"
+    for line in a[start:prefix]:
+        yield " " + line
+    for line in a[prefix:a_end]:
+        yield "-" + line
+    for line in b[prefix:b_end]:
+        yield "+" + line
+    for line in a[a_end:a_stop]:
+        yield " " + line
+
 class Editor:
     @staticmethod
     def generate_diff(original: str, modified: str, filename: str = "note.md") -> None:
         """
         Generates and prints a colored unified diff to the console.
         """
-        original_lines = original.splitlines(keepends=True)
-        modified_lines = modified.splitlines(keepends=True)
-        
-        diff = difflib.unified_diff(
-            original_lines, 
-            modified_lines, 
-            fromfile=f"Original {filename}", 
+        Editor._print_diff(original.splitlines(keepends=True), modified, filename)
+
+    @staticmethod
+    def _print_diff(original_lines: List[str], modified: str, filename: str) -> None:
+        """generate_diff for an original that is already split into lines."""
+        diff = _unified_diff(
+            original_lines,
+            modified.splitlines(keepends=True),
+            fromfile=f"Original {filename}",
             tofile=f"Modified {filename}",
-            lineterm=""
         )
         
         # Visualize with Rich
@@ -50,17 +102,20 @@ class Editor:
         Returns:
             Modified string or raises ValueError if context not found/unique.
         """
-        if context not in original:
+        pos = original.find(context)
+        if pos < 0:
             raise ValueError("Context anchor not found in original text.")
-            
-        if original.count(context) > 1:
+        
+        end = pos + len(context)
+        # A second non-overlapping occurrence (what str.count would see)
+        if original.find(context, max(end, pos + 1)) != -1:
             raise ValueError("Context anchor is not unique in original text.")
             
-        # Perform insertion
+        # Perform insertion by splicing at the single occurrence
         if mode == "after":
-            return original.replace(context, context + "\n" + content + "\n")
+            return original[:end] + "\n" + content + "\n" + original[end:]
         elif mode == "before":
-            return original.replace(context, content + "\n" + context)
+            return original[:pos] + content + "\n" + original[pos:]
         
         return original
 
@@ -87,15 +142,19 @@ class Editor:
             content = p.get("content_to_insert", "")
             mode = p.get("insertion_mode", "after")
             
-            if ctx not in result:
+            pos = result.find(ctx)
+            if pos < 0:
                 continue  # Skip if anchor not found
-            if result.count(ctx) > 1:
+            end = pos + len(ctx)
+            # A second non-overlapping occurrence (what str.count would see)
+            if result.find(ctx, max(end, pos + 1)) != -1:
                 continue  # Skip ambiguous anchors
             
+            # Splice at the single occurrence instead of replace() rescanning
             if mode == "after":
-                result = result.replace(ctx, ctx + "\n\n" + content)
+                result = result[:end] + "\n\n" + content + result[end:]
             else:
-                result = result.replace(ctx, content + "\n\n" + ctx)
+                result = result[:pos] + content + "\n\n" + result[pos:]
         
         return result
     
@@ -111,6 +170,7 @@ class Editor:
         Returns list of (index, proposal, preview_content) for later approval.
         """
         previews = []
+        original_lines = original.splitlines(keepends=True)
         
         for i, p in enumerate(proposals, 1):
             ctx = p.get("target_context", "")[:60]
@@ -131,7 +191,7 @@ class Editor:
                     p.get("content_to_insert", ""),
                     mode
                 )
-                Editor.generate_diff(original, single_result, filename)
+                Editor._print_diff(original_lines, single_result, filename)
                 previews.append((i, p, single_result))
             except ValueError as e:
                 console.print(f"[red]Error: {e}[/red]")
@@ -1,17 +1,155 @@
+import heapq
+import math
+import mmap
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from obx.core.config import settings
 
+_HEADER_RE = re.compile(r'^(#{1,6})\s+(.*)')
+# Same headers, found by scanning a whole note instead of line by line
+_HEADER_LINE_RE = re.compile(r'^(#{1,6})[^\S\r\n]+(.*)', re.MULTILINE)
+_FRONTMATTER_END_RE = re.compile(r'\n---\s*\n')
+
 def _get_vault_path() -> Path:
     if not settings.vault_path:
         raise ValueError("Vault path not configured. Run 'obx config' first.")
     return settings.vault_path
 
-def read_note(filename: str, header: Optional[str] = None) -> str:
-    """Reads the content of a markdown note in the vault, optionally focusing on a specific header."""
+@lru_cache(maxsize=4)
+def _resolved_vault(vault: Path) -> Path:
+    """Resolve the vault root once per configured path rather than on every call."""
+    return vault.resolve()
+
+def _scan_files(vault: Path, exclude: Iterable[str] = (), skip_hidden: bool = False) -> Iterator[os.DirEntry]:
+    """Yield the DirEntry of every file under the vault, pruning excluded (and optionally hidden) folders."""
+    excluded = {os.path.normpath(os.path.join(vault, ex)) for ex in exclude}
+    stack = [str(vault)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path not in excluded and not (skip_hidden and entry.name.startswith(".")):
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except (PermissionError, FileNotFoundError):
+            continue
+
+def walk_vault(vault: Path, exclude: Iterable[str] = ()) -> Iterator[Tuple[Path, os.DirEntry]]:
+    """
+    Recursively yield (path, entry) for every file under the vault.
+
+    Uses os.scandir so directory type checks come from the directory listing,
+    and prunes excluded folders (relative to the vault) without descending into them.
+    """
+    for entry in _scan_files(vault, exclude):
+        yield Path(entry.path), entry
+
+def _iter_md_files(vault: Path) -> Iterator[os.DirEntry]:
+    """
+    Yield a DirEntry for every markdown note a user would look up.
+
+    Hidden folders (.obsidian, .git, .trash) and settings.exclude_folders are
+    never entered, and entries carry their own name and cached stat.
+    """
+    for entry in _scan_files(vault, settings.exclude_folders, skip_hidden=True):
+        if entry.name.endswith(".md"):
+            yield entry
+
+VAULT_INDEX_TTL = 10.0  # Seconds before a cached vault listing is rebuilt
+SNIPPET_READ_BYTES = 8192  # Bytes read per note for folder listing snippets
+
+@dataclass
+class _VaultIndex:
+    """Snapshot of the vault's markdown files, keyed by basename."""
+    root: Path
+    root_mtime: float
+    built_at: float
+    by_name: Dict[str, List[Path]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, vault: Path) -> "_VaultIndex":
+        index = cls(vault, os.stat(vault).st_mtime, time.monotonic())
+        for entry in _iter_md_files(vault):
+            index.by_name.setdefault(entry.name, []).append(Path(entry.path))
+        return index
+
+    def add(self, path: Path) -> None:
+        """Record a note obx just wrote, unless the listing would not include it."""
+        path = Path(os.path.normpath(path))
+        try:
+            folder = path.parent.relative_to(self.root)
+        except ValueError:
+            return
+        if any(part.startswith(".") for part in folder.parts):
+            return
+        if any(folder == Path(ex) or Path(ex) in folder.parents for ex in settings.exclude_folders):
+            return
+        paths = self.by_name.setdefault(path.name, [])
+        if path not in paths:
+            paths.append(path)
+        if path.parent == self.root:
+            # Our own write bumped the root's mtime; that alone is no reason to rescan
+            try:
+                self.root_mtime = os.stat(self.root).st_mtime
+            except OSError:
+                pass
+
+    def is_fresh(self, vault: Path) -> bool:
+        if self.root != vault or time.monotonic() - self.built_at > VAULT_INDEX_TTL:
+            return False
+        try:
+            return os.stat(vault).st_mtime == self.root_mtime
+        except OSError:
+            return False
+
+_vault_index_cache: Optional[_VaultIndex] = None
+
+def _vault_index(refresh: bool = False) -> _VaultIndex:
+    """
+    Return the cached listing of markdown files in the vault.
+
+    The listing is rebuilt when the vault root changes, after VAULT_INDEX_TTL
+    seconds, or on request; callers that miss refresh once before giving up,
+    so notes created in subfolders are still found.
+    """
+    global _vault_index_cache
+    vault = _get_vault_path()
+    if refresh or _vault_index_cache is None or not _vault_index_cache.is_fresh(vault):
+        _vault_index_cache = _VaultIndex.build(vault)
+    return _vault_index_cache
+
+def _record_written_note(file_path: Path) -> None:
+    """Keep a live vault index in step with a note obx wrote, without rescanning."""
+    if _vault_index_cache is not None and file_path.suffix == ".md":
+        _vault_index_cache.add(file_path)
+
+def find_by_name(filename: str) -> Optional[Path]:
+    """
+    Find a note anywhere in the vault whose path ends with filename.
+
+    Replaces a recursive glob per lookup with a basename lookup in the cached
+    vault index, rebuilding it once on a miss or a stale hit.
+    """
+    name = os.path.basename(filename)
+    for refresh in (False, True):
+        for path in _vault_index(refresh).by_name.get(name, ()):
+            if path.match(filename) and path.is_file():
+                return path
+    return None
+
+def locate_note(filename: str) -> Optional[Path]:
+    """Find a note by vault-relative path, falling back to a recursive name match."""
     vault = _get_vault_path()
     # Handle filename with or without .md extension
     if not filename.endswith(".md"):
@@ -21,11 +159,17 @@ def read_note(filename: str, header: Optional[str] = None) -> str:
     
     # Simple fuzzy check if not found directly
     if not file_path.exists():
-        found = list(vault.rglob(filename))
-        if found:
-            file_path = found[0]
-        else:
-            return f"Error: Note '{filename}' not found."
+        return find_by_name(filename)
+    return file_path
+
+def read_note(filename: str, header: Optional[str] = None) -> str:
+    """Reads the content of a markdown note in the vault, optionally focusing on a specific header."""
+    if not filename.endswith(".md"):
+        filename += ".md"
+    
+    file_path = locate_note(filename)
+    if file_path is None:
+        return f"Error: Note '{filename}' not found."
     
     try:
         content = file_path.read_text(encoding="utf-8")
@@ -41,40 +185,57 @@ def read_note(filename: str, header: Optional[str] = None) -> str:
         
         lines = content.splitlines()
         start_idx = -1
+        end_idx = len(lines)
         header_level = 0
         
         # Normalize header string for search
         target_header_clean = header.strip().lower()
+        target_len = len(target_header_clean)
         
+        # One pass: find the header, then keep going until the next header of
+        # the same or higher (lower number) level ends the section.
         for i, line in enumerate(lines):
-            match = re.match(r'^(#{1,6})\s+(.*)', line)
-            if match:
-                level = len(match.group(1))
+            if not line.startswith("#"):
+                continue
+            match = _HEADER_RE.match(line)
+            if not match:
+                continue
+            level = len(match.group(1))
+            if start_idx == -1:
                 text = match.group(2).strip()
-                
+                # Lowercasing ASCII keeps the length, so most headers are
+                # rejected without building a lowered copy
+                if text.isascii() and len(text) != target_len:
+                    continue
                 if text.lower() == target_header_clean:
                     start_idx = i
                     header_level = level
-                    break
+            elif level <= header_level:
+                end_idx = i
+                break
         
         if start_idx == -1:
              return f"Error: Header '{header}' not found in '{filename}'."
              
-        # 2. Extract until next header of same or higher (lower number) level
-        extracted_lines = [lines[start_idx]] # Include the header itself
-        for line in lines[start_idx+1:]:
-            match = re.match(r'^(#{1,6})\s+', line)
-            if match:
-                current_level = len(match.group(1))
-                if current_level <= header_level:
-                    break
-            extracted_lines.append(line)
-            
-        return "\n".join(extracted_lines)
+        return "\n".join(lines[start_idx:end_idx]) # Include the header itself
 
     except Exception as e:
         return f"Error reading file: {e}"
 
+def read_text_prefix(file_path: Path, max_bytes: int) -> Tuple[str, bool]:
+    """
+    Decode at most max_bytes from the start of a UTF-8 file.
+
+    The file is memory-mapped so only the prefix is paged in and decoded.
+    Returns (text, truncated).
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return "", False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:max_bytes].decode("utf-8", errors="replace"), size > max_bytes
+
 def list_note_headers(filename: str) -> str:
     """List markdown headers from a note with their levels."""
     vault = _get_vault_path()
@@ -83,21 +244,16 @@ def list_note_headers(filename: str) -> str:
     file_path = vault / filename
 
     if not file_path.exists():
-        found = list(vault.rglob(filename))
-        if found:
-            file_path = found[0]
-        else:
+        file_path = find_by_name(filename)
+        if file_path is None:
             return f"Error: Note '{filename}' not found."
 
     try:
         content = file_path.read_text(encoding="utf-8")
-        headers = []
-        for line in content.splitlines():
-            match = re.match(r'^(#{1,6})\s+(.*)', line)
-            if match:
-                level = len(match.group(1))
-                text = match.group(2).strip()
-                headers.append(f"{level} {text}")
+        headers = [
+            f"{len(m.group(1))} {m.group(2).strip()}"
+            for m in _HEADER_LINE_RE.finditer(content)
+        ]
         if not headers:
             return "No headers found."
         return "\n".join(headers)
@@ -113,10 +269,50 @@ def write_note(filename: str, content: str) -> str:
     file_path = vault / filename
     try:
         file_path.write_text(content, encoding="utf-8")
+        _record_written_note(file_path)
         return f"Successfully wrote to {filename}"
     except Exception as e:
         return f"Error writing file: {e}"
 
+def atomic_write_text(file_path: Path, text: str) -> None:
+    """
+    Replace a note's content via a temp file and rename.
+
+    An interrupted write leaves the old note intact instead of a truncated
+    one, and the note keeps its permission bits.
+    """
+    tmp = file_path.with_name(file_path.name + ".tmp")
+    try:
+        tmp.write_text(text, encoding="utf-8")
+        try:
+            os.chmod(tmp, os.stat(file_path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, file_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def append_to_note(file_path: Path, text: str) -> None:
+    """
+    Append text to a note as a new block separated by a blank line.
+
+    Trailing whitespace at the end of the note is trimmed by reading only the
+    tail of the file, so the existing content is never read or rewritten in full.
+    """
+    with open(file_path, "r+b") as f:
+        keep = f.seek(0, os.SEEK_END)
+        while keep > 0:
+            start = max(0, keep - 128)
+            f.seek(start)
+            stripped = f.read(keep - start).rstrip()
+            keep = start + len(stripped)
+            if stripped:
+                break
+        f.truncate(keep)
+        f.seek(keep)
+        f.write(b"\n\n" + text.encode("utf-8") + b"\n")
+
 def write_generated_note(content: str, filename: Optional[str] = None) -> str:
     """Write a generated note into the configured output directory."""
     vault = _get_vault_path()
@@ -137,6 +333,7 @@ def write_generated_note(content: str, filename: Optional[str] = None) -> str:
     try:
         tagged_content = "---\ntags: [obx]\n---\n\n" + content.strip() + "\n"
         file_path.write_text(tagged_content, encoding="utf-8")
+        _record_written_note(file_path)
         return f"Successfully wrote to {file_path}"
     except Exception as e:
         return f"Error writing file: {e}"
@@ -144,25 +341,100 @@ def write_generated_note(content: str, filename: Optional[str] = None) -> str:
 def list_notes(limit: int = 20) -> List[str]:
     """Lists recent notes in the vault."""
     vault = _get_vault_path()
-    files = sorted(vault.rglob("*.md"), key=os.path.getmtime, reverse=True)
-    return [f.name for f in files[:limit]]
+    # The mtime comes from the DirEntry, not a second stat per path
+    recent = heapq.nlargest(limit, _iter_md_files(vault), key=lambda e: e.stat().st_mtime)
+    return [e.name for e in recent]
 
 def fuzzy_find(filename: str) -> str:
     """Finds a file path by fuzzy matching the name."""
     vault = _get_vault_path()
-    all_files = list(vault.rglob("*.md"))
-    # Simple substring match for now, or use complex logic if needed
-    matches = [f for f in all_files if filename.lower() in f.name.lower()]
+    note_name = filename if filename.endswith(".md") else f"{filename}.md"
+    # An exact path is listed first; the other substring matches still follow,
+    # since the agent tool shows them as alternatives
+    exact = vault / note_name
+    matches = [exact] if exact.is_file() else []
+
+    needle = filename.lower()
+    # Simple substring match over basenames; each name is checked once
+    # however many folders hold a note by that name.
+    by_name = _vault_index().by_name
+    candidates = (
+        f
+        for name, paths in by_name.items() if needle in name.lower()
+        for f in paths if f != exact and f.is_file()
+    )
+    matches.extend(islice(candidates, 5 - len(matches)))
     
     if not matches:
         return "No matches found."
     
-    # Return top 5
-    return "\n".join([str(f.relative_to(vault)) for f in matches[:5]])
+    return "\n".join([str(f.relative_to(vault)) for f in matches])
 
 
 # --- YAML Frontmatter Helpers for Learning Scores ---
 
+_FM_LINE_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_-]*):( .*)?')
+_FM_INT_RE = re.compile(r'-?(?:0|[1-9][0-9]*)')
+_FM_FLOAT_RE = re.compile(r'-?(?:0|[1-9][0-9]*)\.[0-9]+')
+_FM_WORD_RE = re.compile(r'[A-Za-z][A-Za-z0-9 _.-]*')
+# Plain words YAML resolves to booleans or null rather than strings
+_FM_RESERVED = frozenset({"yes", "no", "y", "n", "true", "false", "on", "off", "null"})
+_FM_UNPARSED = object()
+
+
+def _fm_scalar(value: str):
+    """Resolve a plain frontmatter scalar the way YAML would, or return _FM_UNPARSED."""
+    if not value:
+        return None
+    if _FM_INT_RE.fullmatch(value):
+        return int(value)
+    if _FM_FLOAT_RE.fullmatch(value):
+        return float(value)
+    if _FM_WORD_RE.fullmatch(value) and value.lower() not in _FM_RESERVED:
+        return value
+    return _FM_UNPARSED
+
+
+def _fast_frontmatter(text: str) -> Optional[dict]:
+    """
+    Parse flat `key: value` / `key: [a, b]` frontmatter without PyYAML.
+
+    Returns None for anything outside that dialect (quotes, nesting, block
+    scalars, dates, ...) so the caller can fall back to yaml.safe_load.
+    """
+    lines = text.split("\n")
+    # Only spaces count as blank: YAML rejects tabs where a token could start
+    if lines[0].strip(" "):
+        return None
+    data = {}
+    for line in lines[1:]:
+        if not line.strip(" "):
+            continue
+        match = _FM_LINE_RE.fullmatch(line)
+        if not match or match.group(1).lower() in _FM_RESERVED:
+            return None
+        raw = (match.group(2) or "").strip(" ")
+        if raw.startswith("[") and raw.endswith("]"):
+            inner = raw[1:-1].strip(" ")
+            value = [_fm_scalar(item.strip(" ")) for item in inner.split(",")] if inner else []
+            if any(item is None or item is _FM_UNPARSED for item in value):
+                return None
+        else:
+            value = _fm_scalar(raw)
+            if value is _FM_UNPARSED:
+                return None
+        data[match.group(1)] = value
+    return data
+
+
+def _body_offset(content: str) -> int:
+    """Return where the note body starts, skipping frontmatter without parsing it."""
+    if not content.startswith("---"):
+        return 0
+    end_match = _FRONTMATTER_END_RE.search(content, 3)
+    return end_match.end() if end_match else 0
+
+
 def _parse_yaml_frontmatter(content: str) -> tuple[dict, str, int, int]:
     """
     Parse YAML frontmatter from markdown content.
@@ -170,23 +442,24 @@ def _parse_yaml_frontmatter(content: str) -> tuple[dict, str, int, int]:
     Returns (yaml_dict, body, frontmatter_start, frontmatter_end).
     If no frontmatter, returns ({}, content, -1, -1).
     """
-    import yaml
-    
     if not content.startswith("---"):
         return {}, content, -1, -1
     
     # Find the closing ---
-    end_match = re.search(r'\n---\s*\n', content[3:])
+    end_match = _FRONTMATTER_END_RE.search(content, 3)
     if not end_match:
         return {}, content, -1, -1
     
-    frontmatter_end = 3 + end_match.end()
-    frontmatter_text = content[3:3 + end_match.start()]
+    frontmatter_end = end_match.end()
+    frontmatter_text = content[3:end_match.start()]
     
-    try:
-        yaml_data = yaml.safe_load(frontmatter_text) or {}
-    except yaml.YAMLError:
-        yaml_data = {}
+    yaml_data = _fast_frontmatter(frontmatter_text)
+    if yaml_data is None:
+        import yaml
+        try:
+            yaml_data = yaml.safe_load(frontmatter_text) or {}
+        except yaml.YAMLError:
+            yaml_data = {}
     
     body = content[frontmatter_end:]
     return yaml_data, body, 0, frontmatter_end
@@ -199,10 +472,49 @@ def _serialize_yaml_frontmatter(yaml_dict: dict) -> str:
     if not yaml_dict:
         return ""
     
-    yaml_str = yaml.dump(yaml_dict, default_flow_style=False, allow_unicode=True)
+    yaml_str = yaml.dump(
+        yaml_dict,
+        Dumper=yaml.SafeDumper,
+        default_flow_style=False,
+        allow_unicode=True,
+        sort_keys=False,
+    )
     return f"---\n{yaml_str}---\n\n"
 
 
+def _splice_frontmatter(content: str, updates: dict) -> Optional[str]:
+    """
+    Set numeric keys in flat frontmatter by editing their lines in place.
+
+    Other lines are left byte-for-byte, so no YAML round-trip is needed.
+    Returns None when there is no frontmatter, it is not flat, or a value
+    is not a plain finite number.
+    """
+    if not all(
+        type(v) in (int, float) and math.isfinite(v) for v in updates.values()
+    ):
+        return None
+    if not content.startswith("---"):
+        return None
+    end_match = _FRONTMATTER_END_RE.search(content, 3)
+    if not end_match:
+        return None
+    text = content[3:end_match.start()]
+    if _fast_frontmatter(text) is None:
+        return None
+
+    lines = text.split("\n")
+    pending = dict(updates)
+    for i, line in enumerate(lines):
+        match = _FM_LINE_RE.fullmatch(line)
+        if match and match.group(1) in updates:
+            key = match.group(1)
+            lines[i] = f"{key}: {updates[key]!r}"
+            pending.pop(key, None)
+    lines.extend(f"{key}: {value!r}" for key, value in pending.items())
+    return "---" + "\n".join(lines) + content[end_match.start():]
+
+
 def get_note_yaml(content: str) -> dict:
     """Get the YAML frontmatter dict from note content."""
     yaml_data, _, _, _ = _parse_yaml_frontmatter(content)
@@ -215,6 +527,10 @@ def update_note_yaml(content: str, updates: dict) -> str:
     
     Creates frontmatter if it doesn't exist.
     """
+    spliced = _splice_frontmatter(content, updates)
+    if spliced is not None:
+        return spliced
+
     yaml_data, body, start, end = _parse_yaml_frontmatter(content)
     
     # Merge updates
@@ -243,10 +559,8 @@ def get_learning_scores(filename: str) -> dict:
     
     file_path = vault / filename
     if not file_path.exists():
-        found = list(vault.rglob(filename))
-        if found:
-            file_path = found[0]
-        else:
+        file_path = find_by_name(filename)
+        if file_path is None:
             return {"memory": 0.0, "exercise": 0.0}
     
     try:
@@ -272,10 +586,8 @@ def update_learning_scores(filename: str, memory: float, exercise: float) -> str
     
     file_path = vault / filename
     if not file_path.exists():
-        found = list(vault.rglob(filename))
-        if found:
-            file_path = found[0]
-        else:
+        file_path = find_by_name(filename)
+        if file_path is None:
             return f"Error: Note '{filename}' not found."
     
     try:
@@ -284,7 +596,8 @@ def update_learning_scores(filename: str, memory: float, exercise: float) -> str
             "memory": round(memory, 2),
             "exercise": round(exercise, 2),
         })
-        file_path.write_text(updated, encoding="utf-8")
+        if updated != content:
+            atomic_write_text(file_path, updated)
         return f"Updated learning scores in {file_path.name}"
     except Exception as e:
         return f"Error updating scores: {e}"
@@ -302,21 +615,24 @@ def resolve_note_path(name: str) -> Optional[Path]:
     potential = vault / name
     if not potential.suffix:
         potential = potential.with_suffix(".md")
-    if potential.exists():
+    if os.path.isfile(potential):
         return potential
     
     # Try recursive exact match
     note_name = name if name.endswith(".md") else f"{name}.md"
-    exact_matches = list(vault.rglob(note_name))
-    if exact_matches:
-        return exact_matches[0]
+    exact_match = find_by_name(note_name)
+    if exact_match is not None:
+        return exact_match
     
-    # Fuzzy match
-    all_files = list(vault.rglob("*.md"))
-    matches = [f for f in all_files if name.lower() in f.name.lower()]
-    if matches:
-        # Return best match (shortest name that contains the query)
-        return min(matches, key=lambda f: len(f.name))
+    # Fuzzy match (find_by_name just refreshed the index on its miss)
+    needle = name.lower()
+    by_name = _vault_index().by_name
+    # Return best match (shortest name that contains the query)
+    best = min((n for n in by_name if needle in n.lower()), key=len, default=None)
+    if best is not None:
+        for f in by_name[best]:
+            if f.is_file():
+                return f
     
     return None
 
@@ -327,25 +643,27 @@ def list_vault_hierarchy() -> str:
         vault = _get_vault_path()
         result = [f"Vault: {vault.name}"]
         
-        def walk(path: Path, indent: str = ""):
-            # Get immediate subdirectories, excluding hidden/ignored ones
+        def walk(path: str, indent: str = ""):
+            # Get immediate subdirectories, excluding hidden/ignored ones.
+            # DirEntry.is_dir answers from the listing without a stat per entry.
             try:
-                subdirs = sorted([
-                    d for d in path.iterdir() 
-                    if d.is_dir() 
-                    and not d.name.startswith(('.', '_'))
-                    and d.name not in settings.exclude_folders
-                ])
-                for i, d in enumerate(subdirs):
+                with os.scandir(path) as it:
+                    subdirs = sorted(
+                        (e.name, e.path) for e in it
+                        if not e.name.startswith(('.', '_'))
+                        and e.name not in settings.exclude_folders
+                        and e.is_dir()
+                    )
+                for i, (name, sub_path) in enumerate(subdirs):
                     is_last = (i == len(subdirs) - 1)
                     marker = "└── " if is_last else "├── "
-                    result.append(f"{indent}{marker}{d.name}")
+                    result.append(f"{indent}{marker}{name}")
                     new_indent = indent + ("    " if is_last else "│   ")
-                    walk(d, new_indent)
+                    walk(sub_path, new_indent)
             except PermissionError:
                 result.append(f"{indent}└── [Permission Denied]")
                 
-        walk(vault)
+        walk(str(vault))
         return "\n".join(result)
     except Exception as e:
         return f"Error listing vault hierarchy: {e}"
@@ -357,7 +675,7 @@ def list_folder_contents(folder_path: str = ".") -> str:
     Includes the first 100 characters of each markdown note as a snippet.
     """
     try:
-        base_vault = _get_vault_path()
+        base_vault = _resolved_vault(_get_vault_path())
         
         # Handle relative path from vault root
         if folder_path == "." or not folder_path:
@@ -366,7 +684,7 @@ def list_folder_contents(folder_path: str = ".") -> str:
             target_dir = (base_vault / folder_path).resolve()
         
         # Security check: ensure target_dir is within base_vault
-        if not str(target_dir).startswith(str(base_vault.resolve())):
+        if not target_dir.is_relative_to(base_vault):
             return "Error: Path is outside the vault."
             
         if not target_dir.exists() or not target_dir.is_dir():
@@ -376,19 +694,32 @@ def list_folder_contents(folder_path: str = ".") -> str:
         if not files:
             return f"No files found in '{folder_path}'."
             
-        result = []
-        for f in files:
-            if f.suffix == ".md":
-                try:
+        def describe(f: Path) -> str:
+            if f.suffix != ".md":
+                return f"- {f.name}"
+            try:
+                # Frontmatter plus a 100-char snippet almost always fits in the
+                # first few KB; fall back to the whole note when it does not
+                content, truncated = read_text_prefix(f, SNIPPET_READ_BYTES)
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+                offset = _body_offset(content)
+                if truncated and (len(content) - offset <= 100 or (offset == 0 and content.startswith("---"))):
                     content = f.read_text(encoding="utf-8")
-                    # Get first 100 non-YAML chars
-                    _, body, _, _ = _parse_yaml_frontmatter(content)
-                    snippet = body[:100].replace("\n", " ").strip()
-                    result.append(f"- {f.name}: {snippet}...")
-                except Exception:
-                    result.append(f"- {f.name}: [Error reading content]")
-            else:
-                result.append(f"- {f.name}")
+                    offset = _body_offset(content)
+                # Get first 100 non-YAML chars
+                body = content[offset:]
+                snippet = body[:100].replace("\n", " ").strip()
+                return f"- {f.name}: {snippet}..."
+            except Exception:
+                return f"- {f.name}: [Error reading content]"
+
+        # Reading is latency-bound per file, so overlap the reads
+        if len(files) <= 1:
+            result = list(map(describe, files))
+        else:
+            workers = min(32, (os.cpu_count() or 1) * 4, len(files))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                result = list(pool.map(describe, files))
                 
         return f"Contents of '{folder_path}':\n" + "\n".join(result)
     except Exception as e:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any
+from functools import lru_cache
+from typing import Any, Optional
 from obx.core.config import settings
 from obx.utils.ui import normalize_model_id
 
@@ -16,53 +17,41 @@ def resolve_model(model_id: str) -> Any:
     if normalized.startswith("openrouter:"):
         # Expected format: openrouter:provider/model
         _, name = normalized.split(":", 1)
-        try:
-            from pydantic_ai.models.openrouter import OpenRouterModel
-            from pydantic_ai.providers.openrouter import OpenRouterProvider
-            from openai import AsyncOpenAI
-        except Exception as e:
-            raise RuntimeError(
-                "OpenRouter support requires pydantic-ai-slim[openrouter] and openai. "
-                "Install it with: uv add \"pydantic-ai-slim[openrouter]\""
-            ) from e
-
         api_key = settings.openrouter_api_key
         if not api_key:
             raise RuntimeError(
                 "OPENROUTER_API_KEY is not set. Run `obx config keys` and set the OpenRouter API Key."
             )
+        return _openrouter_model(name, api_key, settings.openrouter_reasoning_effort)
+
+    return normalized
 
-        # Create client specifically to inject reasoning parameters if needed
-        client = AsyncOpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-        )
-        
-        # Inject reasoning effort if configured
-        if settings.openrouter_reasoning_effort:
-            original_create = client.chat.completions.create
-            
-            async def create_with_reasoning(*args, **kwargs):
-                if "extra_body" not in kwargs:
-                    kwargs["extra_body"] = {}
-                
-                # Add reasoning config if not present
-                # usage: obx config model -> OpenRouter -> Reasoning Effort
-                reasoning = kwargs["extra_body"].get("reasoning")
-                if not reasoning:
-                    kwargs["extra_body"]["reasoning"] = {
-                        "effort": settings.openrouter_reasoning_effort
-                    }
-                
-                return await original_create(*args, **kwargs)
-            
-            # Monkey patch the create method on this specific client instance
-            client.chat.completions.create = create_with_reasoning
+@lru_cache(maxsize=32)
+def _openrouter_model(name: str, api_key: str, reasoning_effort: Optional[str]) -> Any:
+    """
+    Build an OpenRouter model, sharing one client and model per configuration.
+
+    Agents are created at import time and most use the same model id, so
+    caching means the provider imports and HTTP client are set up once.
+    """
+    try:
+        from pydantic_ai.models.openrouter import OpenRouterModel, OpenRouterModelSettings
+        from pydantic_ai.providers.openrouter import OpenRouterProvider
+    except Exception as e:
+        raise RuntimeError(
+            "OpenRouter support requires pydantic-ai-slim[openrouter] and openai. "
+            "Install it with: uv add \"pydantic-ai-slim[openrouter]\""
+        ) from e
 
-        provider = OpenRouterProvider(
-            openai_client=client,
-            app_title="obx",
-        )
-        return OpenRouterModel(name, provider=provider)
+    # Reasoning effort is a model-level default, so pydantic-ai adds it to each
+    # request body unless a run passes its own openrouter_reasoning setting.
+    # usage: obx config model -> OpenRouter -> Reasoning Effort
+    model_settings = None
+    if reasoning_effort:
+        model_settings = OpenRouterModelSettings(openrouter_reasoning={"effort": reasoning_effort})
 
-    return normalized
+    provider = OpenRouterProvider(
+        api_key=api_key,
+        app_title="obx",
+    )
+    return OpenRouterModel(name, provider=provider, settings=model_settings)
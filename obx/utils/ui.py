@@ -3,12 +3,21 @@ from rich.live import Live
 from rich.markdown import Markdown
 from rich.theme import Theme
 from rich.text import Text
+import asyncio
 import re
 import urllib.parse
+from pathlib import Path
 import json
 from typing import Any, Optional, Dict
 from contextlib import contextmanager
+from functools import lru_cache
 import time
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 from obx.core.config import settings
 
 # Custom theme for better markdown aesthetics vs readability
@@ -38,7 +47,27 @@ obx_theme = Theme({
     "markdown.hr": "#FFFFFF",                # Horizontal rule
 })
 
-console = Console(theme=obx_theme, style="#FFFFFF", force_terminal=True, color_system="truecolor")
+# highlight=False: skip Rich's repr highlighter, which runs a set of regexes over every
+# print and recolours numbers and paths away from the white theme. Markup stays on.
+console = Console(
+    theme=obx_theme,
+    style="#FFFFFF",
+    force_terminal=True,
+    color_system="truecolor",
+    highlight=False,
+)
+
+# Minimum seconds between markdown re-renders while streaming, unless a new line completed
+STREAM_RENDER_INTERVAL = 0.25
+# Completed lines render sooner, but never more often than this (about 10 Hz)
+STREAM_LINE_RENDER_INTERVAL = 0.1
+
+# Source citations, block math and inline math, rewritten in a single scan
+_MARKDOWN_REWRITE_RE = re.compile(
+    r'\[(?:Source|Vault Note|vault note): (?P<source>.*?)\]'
+    r'|\$\$(?P<block>(?s:.*?))\$\$'
+    r'|(?<!\\)\$(?!\s)(?P<inline>[^$\n]+?)(?<!\s)(?<!\\)\$'
+)
 
 @contextmanager
 def command_timer():
@@ -56,24 +85,26 @@ def log_model_usage(label: str, model: str) -> None:
 def log_embedding_usage(provider: str, model: str) -> None:
     console.print(f"Embedding: {provider} {model}")
 
+_USAGE_KEYS = (
+    "total_tokens",
+    "input_tokens",
+    "output_tokens",
+    "prompt_tokens",
+    "completion_tokens",
+    "response_tokens",
+)
+
 def _extract_usage(usage_obj: Any) -> Dict[str, int]:
+    if callable(usage_obj):
+        # pydantic-ai run results expose usage() as a method
+        usage_obj = usage_obj()
     if usage_obj is None:
         return {}
     if isinstance(usage_obj, dict):
         return {k: int(v) for k, v in usage_obj.items() if isinstance(v, (int, float))}
-    usage = {}
-    for key in (
-        "total_tokens",
-        "input_tokens",
-        "output_tokens",
-        "prompt_tokens",
-        "completion_tokens",
-        "response_tokens",
-    ):
-        val = getattr(usage_obj, key, None)
-        if isinstance(val, (int, float)):
-            usage[key] = int(val)
-    return usage
+    # getattr rather than __dict__: total_tokens is a property on RunUsage
+    values = ((key, getattr(usage_obj, key, None)) for key in _USAGE_KEYS)
+    return {key: int(val) for key, val in values if isinstance(val, (int, float))}
 
 def _tokens_generated(usage: Dict[str, int]) -> Optional[int]:
     for key in ("output_tokens", "completion_tokens", "response_tokens"):
@@ -105,18 +136,28 @@ def format_markdown(text: str) -> str:
     """Pre-processes markdown to make LaTeX math look nicer and highlight sources."""
     if not text:
         return ""
-    
+    # Every rewrite needs a '$' or a '[', and most text has neither; skip the
+    # regex scan (and a cache entry) when a C substring probe says so
+    if "$" not in text and "[" not in text:
+        return text
+    return _format_markdown(text, settings.vault_path)
+
+@lru_cache(maxsize=256)
+def _format_markdown(text: str, vault_path: Optional[Path]) -> str:
+    # Keyed on the vault too, since source links embed its name. Streaming
+    # re-renders the same tail whenever only the thinking text moved.
+    vault_name = urllib.parse.quote(vault_path.name) if vault_path else None
+
     # 0. Highlight Sources: [Source: Note Name] or [vault note: Note Name] -> link to Obsidian
-    def replace_source(match):
-        note_ref = match.group(1).strip()
+    def replace_source(note_ref: str) -> str:
+        note_ref = note_ref.strip()
         note_name = note_ref
         header = None
         if " > " in note_ref:
             note_name, header = note_ref.split(" > ", 1)
             note_name = note_name.strip()
             header = header.strip()
-        if settings.vault_path:
-            vault_name = urllib.parse.quote(settings.vault_path.name)
+        if vault_name is not None:
             # Encode file path (allow / for nested paths)
             encoded_file = urllib.parse.quote(note_name, safe="/")
             if header:
@@ -132,28 +173,17 @@ def format_markdown(text: str) -> str:
         # Fallback when vault path isn't configured
         return note_name if not header else f"{note_name} > {header}"
 
-    text = re.sub(
-        r'\[(?:Source|Vault Note|vault note): (.*?)\]', 
-        replace_source, 
-        text
-    )
-
-    # 1. Block Math: $$ ... $$ -> ```latex ... ```
-    text = re.sub(
-        r'\$\$(.*?)\$\$', 
-        r'```latex\n\1\n```', 
-        text, 
-        flags=re.DOTALL
-    )
-    
-    # 2. Inline Math: $...$ -> `$ ... $`
-    text = re.sub(
-        r'(?<!\\)\$(?!\s)([^$\n]+?)(?<!\s)(?<!\\)\$', 
-        r'`$\1$`', 
-        text
-    )
-    
-    return text
+    def rewrite(match: re.Match) -> str:
+        kind = match.lastgroup
+        if kind == "source":
+            return replace_source(match.group("source"))
+        # 1. Block Math: $$ ... $$ -> ```latex ... ```
+        if kind == "block":
+            return f"```latex\n{match.group('block')}\n```"
+        # 2. Inline Math: $...$ -> `$ ... $`
+        return f"`${match.group('inline')}$`"
+
+    return _MARKDOWN_REWRITE_RE.sub(rewrite, text)
 
 def render_markdown(text: str) -> None:
     """Render formatted markdown to the console using the shared theme."""
@@ -165,7 +195,9 @@ def _stringify_tool_args(args: Any) -> str:
     if isinstance(args, str):
         return args
     try:
-        return json.dumps(args, ensure_ascii=True)
+        if orjson is not None:
+            return orjson.dumps(args).decode("utf-8")
+        return json.dumps(args, ensure_ascii=False, separators=(",", ":"))
     except Exception:
         return str(args)
 
@@ -195,74 +227,175 @@ async def stream_agent_output(agent, prompt: str) -> tuple[Optional[str], Dict[s
         usage = _extract_usage(getattr(result, "usage", None))
         return str(result.output), usage
 
-    output_text = ""
-    thinking_text = ""
-    log_lines: list[str] = []
+    # Streamed text is collected as chunks and joined only when rendered: `+=` on
+    # a closure variable copies the whole buffer per delta, which is quadratic
+    output_chunks: list = []
+    thinking_chunks: list = []
+    # Set when a delta completed a line since the last render
+    line_completed = False
+    # Tool calls and results, appended in place so renders never re-join them
+    log_text = Text(style="dim")
+    sealed: list = []
+    sealed_len = 0
+
+    def joined(chunks: list) -> str:
+        # Collapse to a single chunk so the next join only copies what arrived since
+        if len(chunks) > 1:
+            chunks[:] = ["".join(chunks)]
+        return chunks[0] if chunks else ""
+
+    def add_output(delta: str) -> None:
+        nonlocal line_completed
+        output_chunks.append(delta)
+        if "\n" in delta:
+            line_completed = True
 
-    def make_renderable():
+    def seal() -> None:
+        # Text before the last paragraph break is final once its $$ blocks and
+        # code fences are closed (the other patterns never span lines), so it is
+        # formatted and parsed into a Markdown once; only the open tail is
+        # re-parsed on each render.
+        nonlocal sealed_len
+        output_text = joined(output_chunks)
+        split = output_text.rfind("\n\n")
+        if (
+            split > sealed_len
+            and output_text.count("$$", sealed_len, split) % 2 == 0
+            and output_text.count("```", sealed_len, split) % 2 == 0
+        ):
+            if sealed:
+                sealed.append(Text())  # Blank line a single Markdown would put between blocks
+            sealed.append(Markdown(format_markdown(output_text[sealed_len:split])))
+            sealed_len = split
+
+    # The thinking text only grows, so its Text is rebuilt only when new chunks
+    # arrived since the last render
+    thinking_render: Optional[Text] = None
+
+    def log(line: str) -> None:
+        if log_text:
+            log_text.append("\n")
+        log_text.append(line)
+
+    def make_renderable(final: bool = False):
+        nonlocal thinking_render
         parts = []
-        if log_lines:
-            parts.append(Text("\n".join(log_lines), style="dim"))
-        if thinking_text:
-            parts.append(Text(f"thinking: {thinking_text}", style="dim"))
-        parts.append(Markdown(format_markdown(output_text)))
+        if log_text:
+            parts.append(log_text)
+        if thinking_chunks:
+            if thinking_render is None or len(thinking_chunks) > 1:
+                thinking_render = Text(f"thinking: {joined(thinking_chunks)}", style="dim")
+            parts.append(thinking_render)
+        output_text = joined(output_chunks)
+        if final:
+            # Blocks that span a paragraph break (loose lists, quotes) only
+            # render exactly as one document, so the finished text gets one
+            parts.append(Markdown(format_markdown(output_text)))
+        else:
+            seal()
+            parts.extend(sealed)
+            if sealed:
+                parts.append(Text())
+            parts.append(Markdown(format_markdown(output_text[sealed_len:])))
         return Group(*parts)
 
     usage: Dict[str, int] = {}
+    last_rendered_at = 0.0
+    # Set when the rate limit held back an update; flush_pending renders it
+    pending = False
+
+    def refresh(live: Live, force: bool = False, final: bool = False) -> None:
+        # Re-parsing the whole markdown buffer per token is O(N^2); only re-render
+        # when a line completes or the render interval has elapsed. Line-heavy
+        # output (lists, code) can complete many lines a second, so those
+        # renders are rate-limited too.
+        nonlocal line_completed, last_rendered_at, pending
+        now = time.monotonic()
+        elapsed = now - last_rendered_at
+        if (
+            force
+            or elapsed > STREAM_RENDER_INTERVAL
+            or (line_completed and elapsed >= STREAM_LINE_RENDER_INTERVAL)
+        ):
+            live.update(make_renderable(final))
+            line_completed = False
+            last_rendered_at = now
+            pending = False
+        else:
+            pending = True
+
+    async def flush_pending(live: Live) -> None:
+        # A held-back update would otherwise wait for the next event, which can
+        # be a whole tool call away
+        while True:
+            await asyncio.sleep(STREAM_LINE_RENDER_INTERVAL)
+            if pending:
+                refresh(live, force=True)
+
+    with Live(make_renderable(), refresh_per_second=4, console=console) as live:
+        flusher = asyncio.create_task(flush_pending(live))
+        try:
+            async for event in agent.run_stream_events(prompt):
+                # Deltas are nearly every event, so they are checked first
+                if isinstance(event, PartDeltaEvent):
+                    if isinstance(event.delta, TextPartDelta):
+                        if event.delta.content_delta:
+                            add_output(event.delta.content_delta)
+                            refresh(live)
+                    elif isinstance(event.delta, ThinkingPartDelta):
+                        if event.delta.content_delta:
+                            thinking_chunks.append(event.delta.content_delta)
+                            refresh(live)
+                    continue
 
-    with Live(make_renderable(), refresh_per_second=12, console=console) as live:
-        async for event in agent.run_stream_events(prompt):
-            if isinstance(event, AgentRunResultEvent):
-                if isinstance(event.result.output, str):
-                    output_text = event.result.output
-                    live.update(make_renderable())
-                usage = _extract_usage(getattr(event.result, "usage", None))
-                continue
-
-            if isinstance(event, PartStartEvent):
-                part_kind = getattr(event.part, "part_kind", None)
-                content = getattr(event.part, "content", None)
-                if part_kind == "text" and content:
-                    output_text += content
-                    live.update(make_renderable())
-                elif part_kind == "thinking" and content:
-                    thinking_text += content
-                    live.update(make_renderable())
-                continue
-
-            if isinstance(event, PartDeltaEvent):
-                if isinstance(event.delta, TextPartDelta):
-                    if event.delta.content_delta:
-                        output_text += event.delta.content_delta
-                        live.update(make_renderable())
-                elif isinstance(event.delta, ThinkingPartDelta):
-                    if event.delta.content_delta:
-                        thinking_text += event.delta.content_delta
-                        live.update(make_renderable())
-                continue
-
-            if isinstance(event, FunctionToolCallEvent):
-                tool_name = event.part.tool_name
-                tool_args = _stringify_tool_args(event.part.args)
-                if tool_args:
-                    log_lines.append(f"tool call: {tool_name} {tool_args}")
-                else:
-                    log_lines.append(f"tool call: {tool_name}")
-                live.update(make_renderable())
-                continue
-
-            if isinstance(event, FunctionToolResultEvent):
-                result_text = getattr(event.result, "content", None)
-                tool_name = getattr(event.result, "tool_name", None)
-                if result_text:
-                    result_str = _truncate(str(result_text))
-                    if tool_name:
-                        log_lines.append(f"tool result: {tool_name} {result_str}")
+                if isinstance(event, AgentRunResultEvent):
+                    if isinstance(event.result.output, str):
+                        # The final output replaces the streamed text, so drop the sealed blocks
+                        output_chunks[:] = [event.result.output]
+                        sealed.clear()
+                        sealed_len = 0
+                        refresh(live, force=True, final=True)
+                    usage = _extract_usage(getattr(event.result, "usage", None))
+                    continue
+
+                if isinstance(event, PartStartEvent):
+                    part_kind = getattr(event.part, "part_kind", None)
+                    content = getattr(event.part, "content", None)
+                    if part_kind == "text" and content:
+                        add_output(content)
+                        refresh(live)
+                    elif part_kind == "thinking" and content:
+                        thinking_chunks.append(content)
+                        refresh(live)
+                    continue
+
+                if isinstance(event, FunctionToolCallEvent):
+                    tool_name = event.part.tool_name
+                    tool_args = _stringify_tool_args(event.part.args)
+                    if tool_args:
+                        log(f"tool call: {tool_name} {tool_args}")
                     else:
-                        log_lines.append(f"tool result: {result_str}")
-                else:
-                    log_lines.append(f"tool result: {event.tool_call_id}")
-                live.update(make_renderable())
-                continue
+                        log(f"tool call: {tool_name}")
+                    refresh(live)
+                    continue
+
+                if isinstance(event, FunctionToolResultEvent):
+                    result_text = getattr(event.result, "content", None)
+                    tool_name = getattr(event.result, "tool_name", None)
+                    if result_text:
+                        result_str = _truncate(str(result_text))
+                        if tool_name:
+                            log(f"tool result: {tool_name} {result_str}")
+                        else:
+                            log(f"tool result: {result_str}")
+                    else:
+                        log(f"tool result: {event.tool_call_id}")
+                    refresh(live)
+                    continue
+        finally:
+            flusher.cancel()
+
+        # Flush any deltas that were coalesced since the last render
+        refresh(live, force=True, final=True)
 
-    return output_text, usage
+    return joined(output_chunks), usage
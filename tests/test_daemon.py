@@ -0,0 +1,90 @@
+"""Search daemon: protocol, lazy engine load, single instance, stalled clients."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from obx.core.config import settings
+from obx.rag import daemon, engine
+
+
+class FakeRAG:
+    instances = 0
+
+    def __init__(self):
+        FakeRAG.instances += 1
+        self.metadata_path = engine.OBX_DIR / "no-such-metadata"
+
+    def search(self, query, limit=5, weights=0.5):
+        return [{"source": f"{query}.md", "score": 0.5, "limit": limit}][:limit]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", tmp_path / "obx.sock")
+    monkeypatch.setattr(daemon, "LOCK_PATH", tmp_path / "obx.lock")
+    monkeypatch.setattr(daemon, "IDLE_TIMEOUT", 1.0)
+    monkeypatch.setattr(daemon, "CLIENT_TIMEOUT", 0.3)
+    monkeypatch.setattr(settings, "search_daemon", True)
+    monkeypatch.setattr(engine, "RAG", FakeRAG)
+    FakeRAG.instances = 0
+
+    thread = threading.Thread(target=daemon._Server().serve, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if daemon.SOCKET_PATH.exists():
+            break
+        time.sleep(0.01)
+    yield thread
+    thread.join(timeout=5)
+
+
+def test_search_round_trip_loads_engine_lazily(server):
+    assert daemon._request("ping", {}) == "pong"
+    assert FakeRAG.instances == 0
+
+    assert daemon.search("topic", limit=3) == [{"source": "topic.md", "score": 0.5, "limit": 3}]
+    assert daemon.search("other") == [{"source": "other.md", "score": 0.5, "limit": 5}]
+    assert FakeRAG.instances == 1
+
+
+def test_errors_are_returned_to_the_client(server):
+    with pytest.raises(RuntimeError, match="Unknown method"):
+        daemon._request("embed", {})
+    # The daemon keeps serving after a failed request
+    assert daemon._request("ping", {}) == "pong"
+
+
+def test_second_daemon_exits_without_loading(server):
+    started = time.monotonic()
+    daemon._Server().serve()
+    assert time.monotonic() - started < 0.5
+    assert FakeRAG.instances == 0
+    assert daemon._request("ping", {}) == "pong"
+
+
+def test_silent_client_does_not_stall_daemon(server):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as silent:
+        silent.connect(str(daemon.SOCKET_PATH))
+        # The daemon gives up on the silent client after CLIENT_TIMEOUT
+        time.sleep(daemon.CLIENT_TIMEOUT * 2)
+        assert daemon._request("ping", {}) == "pong"
+
+
+def test_missing_daemon_is_spawned_and_caller_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", tmp_path / "obx.sock")
+    monkeypatch.setattr(settings, "search_daemon", True)
+    spawned = []
+    monkeypatch.setattr(daemon, "_spawn", lambda: spawned.append(True))
+
+    assert daemon.search("topic") is None
+    assert spawned == [True]
+
+
+def test_disabled_daemon_is_not_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", tmp_path / "obx.sock")
+    monkeypatch.setattr(settings, "search_daemon", False)
+    monkeypatch.setattr(daemon, "_spawn", lambda: pytest.fail("spawned a disabled daemon"))
+    assert daemon.search("topic") is None
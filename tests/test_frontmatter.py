@@ -0,0 +1,134 @@
+"""Differential tests: the frontmatter fast path and splicer against PyYAML."""
+
+import random
+
+import pytest
+import yaml
+
+from obx.utils.fs import _fast_frontmatter, _splice_frontmatter, update_note_yaml
+
+KEYS = ["memory", "exercise", "tags", "title", "a_b", "x-y", "Yes", "null", "on"]
+VALUES = [
+    "", "0", "1", "-3", "01", "-0", "1.5", "-0.25", "1.", ".5", "1e3", "0x1f", "1_000",
+    "inf", ".inf", "nan", "~", "yes", "No", "TRUE", "off", "null", "y",
+    "word", "two words", "v1.2", "a-b_c", "CamelCase", "x:y", "a #b", "#c",
+    "'quoted'", '"dq"', "2024-01-01", "12:30", "&anchor", "*ref", "!tag x", "|", ">",
+    "[]", "[a, b]", "[1, 2.5]", "[a,b]", "[ a ]", "[yes, no]", "[a, ]", "[, a]", "[a, [b]]",
+    "{a: 1}", "a, b", "-", "- a", "%", "@x", "`x`", "é",
+]
+EXTRA_LINES = ["", "   ", "# comment", "  indented: 1", "- item", "key:value", "\t", "k: v  ", "k:  v"]
+
+
+def random_frontmatter(rng):
+    lines = []
+    for _ in range(rng.randint(0, 6)):
+        if rng.random() < 0.15:
+            lines.append(rng.choice(EXTRA_LINES))
+        else:
+            value = rng.choice(VALUES)
+            lines.append(f"{rng.choice(KEYS)}:" + (f" {value}" if value else rng.choice(["", " "])))
+    return "\n" + "\n".join(lines) + "\n"
+
+
+def yaml_load(text):
+    # Reference behaviour: what _parse_yaml_frontmatter does without the fast path
+    try:
+        return yaml.safe_load(text) or {}
+    except yaml.YAMLError:
+        return {}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("\nmemory: 0.5\nexercise: 1\n", {"memory": 0.5, "exercise": 1}),
+    ("\ntags: [a, b]\ntitle: Linear Algebra\n", {"tags": ["a", "b"], "title": "Linear Algebra"}),
+    ("\ntags: []\nempty:\n", {"tags": [], "empty": None}),
+    ("\n\nmemory: -0.25\n\n", {"memory": -0.25}),
+])
+def test_fast_path_handles_flat_frontmatter(text, expected):
+    assert _fast_frontmatter(text) == expected
+    assert yaml_load(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "\nflag: yes\n",
+    "\ntitle: 'quoted'\n",
+    "\ndate: 2024-01-01\n",
+    "\nnested:\n  a: 1\n",
+    "\nnum: 1e3\n",
+    "\nnum: 01\n",
+    "\nvalue: ~\n",
+    "\nlist: [a, yes]\n",
+])
+def test_fast_path_defers_to_yaml(text):
+    assert _fast_frontmatter(text) is None
+
+
+def test_fast_path_agrees_with_yaml():
+    rng = random.Random(0)
+    parsed = 0
+    for _ in range(20000):
+        text = random_frontmatter(rng)
+        fast = _fast_frontmatter(text)
+        if fast is None:
+            continue
+        parsed += 1
+        assert fast == yaml_load(text), text
+    # The fuzz must exercise the fast path, not only the fallback
+    assert parsed > 1000
+
+
+def test_splice_agrees_with_yaml_merge():
+    rng = random.Random(1)
+    spliced_count = 0
+    for _ in range(20000):
+        frontmatter = random_frontmatter(rng)
+        body = rng.choice(["", "# Title\n\nBody text.\n", "---\nnot frontmatter\n"])
+        content = f"---{frontmatter}---\n{body}"
+        updates = {
+            key: rng.choice([0.0, 0.42, 1.0, 3, -1, 0.1 + 0.2])
+            for key in rng.sample(["memory", "exercise", "new_key"], rng.randint(1, 3))
+        }
+        spliced = _splice_frontmatter(content, updates)
+        if spliced is None:
+            continue
+        spliced_count += 1
+
+        head, sep, rest = spliced[3:].partition("\n---\n")
+        assert sep and rest == body, spliced
+        assert yaml_load(head) == {**yaml_load(frontmatter), **updates}, spliced
+
+        # Lines that do not hold an updated key are left byte-for-byte
+        untouched = [
+            line for line in frontmatter.split("\n")
+            if not any(line.startswith(f"{key}:") for key in updates)
+        ]
+        kept = head.split("\n")
+        assert all(line in kept for line in untouched), spliced
+    assert spliced_count > 1000
+
+
+def test_splice_declines_what_it_cannot_edit():
+    assert _splice_frontmatter("no frontmatter\n", {"memory": 0.5}) is None
+    assert _splice_frontmatter("---\nnested:\n  a: 1\n---\n", {"memory": 0.5}) is None
+    assert _splice_frontmatter("---\nmemory: 0.1\n---\n", {"memory": "high"}) is None
+    assert _splice_frontmatter("---\nmemory: 0.1\n---\n", {"memory": float("nan")}) is None
+    assert _splice_frontmatter("---\nmemory: 0.1\n---\n", {"memory": True}) is None
+
+
+@pytest.mark.parametrize("content", [
+    "# Note\n\nBody\n",
+    "---\ntitle: Note\nmemory: 0.1\n---\n# Note\n",
+    "---\ntitle: 'Quoted: title'\nnested:\n  a: 1\n---\nBody\n",
+])
+def test_update_note_yaml_round_trips(content):
+    updates = {"memory": 0.75, "exercise": 0.5}
+    updated = update_note_yaml(content, updates)
+    head, sep, body = updated[4:].partition("\n---\n")
+    assert updated.startswith("---\n") and sep
+
+    original, original_body = {}, content
+    if content.startswith("---\n"):
+        original_head, _, original_body = content[4:].partition("\n---\n")
+        original = yaml_load(original_head)
+    assert yaml_load(head) == {**original, **updates}
+    assert body.lstrip("\n") == original_body.lstrip("\n")
@@ -0,0 +1,160 @@
+"""Incremental ingest: unchanged, shrunk, emptied and deleted notes."""
+
+import asyncio
+import os
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from obx.core.config import settings
+from obx.rag import engine
+
+
+class FakeEmbeddings:
+    """Dict-backed stand-in for txtai.Embeddings: keyword search over chunk text."""
+
+    def __init__(self, config=None):
+        self.rows = {}
+
+    def upsert(self, documents):
+        for uid, data, _ in documents:
+            self.rows[uid] = data["text"]
+
+    def delete(self, ids):
+        for uid in ids:
+            self.rows.pop(uid, None)
+
+    def search(self, query, limit, weights=0.5):
+        hits = [uid for uid, text in self.rows.items() if query in text]
+        return [{"id": uid, "score": 1.0} for uid in hits[:limit]]
+
+    def save(self, path):
+        Path(path).mkdir(parents=True, exist_ok=True)
+
+    def load(self, path):
+        pass
+
+
+class FakeChunker:
+    """One chunk per blank-line separated paragraph."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def chunk(self, text):
+        return [
+            SimpleNamespace(text=m.group(0), start_index=m.start())
+            for m in re.finditer(r"\S(?:.|\n(?!\n))*", text)
+        ]
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    obx_dir = tmp_path / ".obx"
+    obx_dir.mkdir()
+    monkeypatch.setattr(engine, "Embeddings", FakeEmbeddings)
+    monkeypatch.setattr(engine, "SemanticChunker", FakeChunker)
+    monkeypatch.setattr(engine, "OBX_DIR", obx_dir)
+    monkeypatch.setattr(engine, "INDEX_PATH", obx_dir / "txtai_index")
+    monkeypatch.setattr(settings, "vault_path", vault)
+    monkeypatch.setattr(settings, "exclude_folders", [])
+    return vault
+
+
+def ingest(rag):
+    asyncio.run(rag.ingest())
+
+
+def sources(rag, query):
+    return sorted({r["source"] for r in rag.search(query, limit=50)})
+
+
+def touch_later(path, text):
+    # Make sure the mtime moves even on coarse-grained filesystems
+    st = path.stat()
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_unchanged_notes_are_skipped(vault):
+    (vault / "a.md").write_text("alpha one\n\nalpha two", encoding="utf-8")
+    rag = engine.RAG()
+    ingest(rag)
+    assert sources(rag, "alpha") == ["a.md"]
+
+    upserts = []
+    rag.embeddings.upsert = upserts.append
+    ingest(rag)
+    assert upserts == []
+
+
+def test_shrunk_note_drops_trailing_chunks(vault):
+    note = vault / "a.md"
+    note.write_text("alpha one\n\nalpha two\n\nalpha three", encoding="utf-8")
+    rag = engine.RAG()
+    ingest(rag)
+    assert set(rag.embeddings.rows) == {"a.md#0", "a.md#1", "a.md#2"}
+
+    touch_later(note, "alpha one")
+    ingest(rag)
+    assert set(rag.embeddings.rows) == {"a.md#0"}
+    assert set(rag.metadata_store) == {"a.md#0"}
+
+
+def test_deleted_note_is_removed_from_index_and_tracker(vault):
+    (vault / "a.md").write_text("alpha", encoding="utf-8")
+    (vault / "b.md").write_text("beta one\n\nbeta two", encoding="utf-8")
+    rag = engine.RAG()
+    ingest(rag)
+    assert sources(rag, "beta") == ["b.md"]
+
+    (vault / "b.md").unlink()
+    ingest(rag)
+    assert sources(rag, "beta") == []
+    assert not any(k.startswith("b.md") for k in rag.metadata_store)
+    assert str(vault / "b.md") not in rag.tracker
+
+    # The deletion is persisted, not just applied in memory
+    reloaded = engine.RAG()
+    assert not any(k.startswith("b.md") for k in reloaded.metadata_store)
+    assert str(vault / "b.md") not in reloaded.tracker
+
+
+def test_emptied_note_is_removed_from_index(vault):
+    note = vault / "a.md"
+    note.write_text("alpha one\n\nalpha two", encoding="utf-8")
+    rag = engine.RAG()
+    ingest(rag)
+
+    touch_later(note, "  \n")
+    ingest(rag)
+    assert sources(rag, "alpha") == []
+    assert rag.metadata_store == {}
+
+    touch_later(note, "")
+    ingest(rag)
+    assert rag.metadata_store == {}
+
+
+def test_renamed_note_keeps_same_named_chunks(vault):
+    (vault / "old").mkdir()
+    (vault / "new").mkdir()
+    (vault / "old" / "x.md").write_text("gamma", encoding="utf-8")
+    rag = engine.RAG()
+    ingest(rag)
+
+    (vault / "old" / "x.md").rename(vault / "new" / "x.md")
+    ingest(rag)
+    assert sources(rag, "gamma") == ["x.md"]
+    assert rag.metadata_store["x.md#0"].path == str(vault / "new" / "x.md")
+
+
+def test_pdfs_are_not_scanned(vault):
+    (vault / "a.md").write_text("alpha", encoding="utf-8")
+    (vault / "paper.pdf").write_bytes(b"%PDF-1.4")
+    rag = engine.RAG()
+    assert [p.name for p, _ in rag._get_vault_files()] == ["a.md"]